@@ -1,17 +1,99 @@
 # -*- coding: utf-8 -*-
+import json
+import logging
+import os
+
 import streamlit as st
 import pandas as pd
 
 from seimei_calc import (
+    DICT_FILE,
     load_dict,
     calc,
+    dictionary_version,
     normalize_name,
     stroke_for_char,
 )
+from seimei_timing import StageTimer, summarize
+from seimei_warm import ensure_warm
+from kanji_readings import build_trie, load_readings, search as search_reading
 
 st.set_page_config(page_title="姓名判断", layout="centered")
 st.title("姓名判断")
 
+log = logging.getLogger("seimei.app")
+if not log.handlers:
+    _h = logging.StreamHandler()
+    _h.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+    log.addHandler(_h)
+    log.setLevel(logging.INFO)
+
+DIAG_HISTORY = 1000   # セッションで保持する計測件数
+_DICT_LOADS = {"n": 0}
+
+@st.cache_resource(max_entries=2)
+def _cached_dict(mtime: float):
+    # 辞書CSVの更新時刻をキーにして、書き換えられたときだけ読み直す
+    _DICT_LOADS["n"] += 1
+    table = load_dict()
+    return table, dictionary_version(table)
+
+def get_dict():
+    """(辞書, 辞書の版, キャッシュヒットか)"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), DICT_FILE)
+    before = _DICT_LOADS["n"]
+    table, version = _cached_dict(os.path.getmtime(path))
+    return table, version, _DICT_LOADS["n"] == before
+
+@st.cache_resource(max_entries=2)
+def _cached_trie(mtime: float):
+    # 読み→漢字のトライ木（readings 列から作る）
+    return build_trie(load_readings())
+
+def get_trie():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), DICT_FILE)
+    return _cached_trie(os.path.getmtime(path))
+
+@st.cache_resource(max_entries=2)
+def _cached_warm(version: str, _table):
+    # よく使う姓×名の計算済みファイル（辞書の版が変わっていれば作り直す）
+    try:
+        return ensure_warm(_table)
+    except OSError as e:
+        log.warning("warm ファイルを使えません: %s", e)
+        return None
+
+def get_warm(table, version):
+    return _cached_warm(version, table)
+
+def render_diagnostics(record, history):
+    """今回の段ごとの時間と、セッション全体の p50/p95/p99"""
+    with st.expander("診断（処理時間）", expanded=True):
+        st.caption(
+            f"辞書: {record['dict_version']} / キャッシュ: {'ヒット' if record['cache_hit'] else 'ミス'}"
+            f" / 合計 {record['total_ms']:.1f} ms"
+        )
+        names = list(record["stages_ms"]) + ["total"]
+        rows = []
+        for name in names:
+            if name == "total":
+                values = [h["total_ms"] for h in history]
+                now = record["total_ms"]
+            else:
+                values = [h["stages_ms"].get(name, 0.0) for h in history]
+                now = record["stages_ms"][name]
+            s = summarize(values)
+            rows.append({
+                "段": name, "今回(ms)": round(now, 2),
+                "p50": round(s["p50"], 2), "p95": round(s["p95"], 2), "p99": round(s["p99"], 2),
+                "件数": s["n"],
+            })
+        st.dataframe(pd.DataFrame(rows), use_container_width=True)
+        hits = sum(1 for h in history if h["cache_hit"])
+        st.caption(f"キャッシュヒット率: {hits}/{len(history)}")
+
+show_diag = st.sidebar.checkbox("診断パネルを表示", value=False)
+
 def fmt_expr(terms, total):
     """
     terms: List[Tuple[str, int]] を「字（画数）」の足し算式に整形
@@ -30,9 +112,16 @@ with st.form("inputs"):
 
 if submitted:
     try:
-        table = load_dict()  # 固定: kanji_master_joyo.csv
-        # まず既存ロジックで最終値を算出
-        res = calc(family, given, table)
+        timer = StageTimer()
+        table, dict_ver, cache_hit = get_dict()  # 固定: kanji_master_joyo.csv
+        timer.lap("load_dict")
+        # warm ファイルは辞書の版が変わると初回に作り直す（全件の計算）ので、開くまでは計測に含めない
+        warm = get_warm(table, dict_ver)
+        warm_ms = timer.skip()
+        # まず既存ロジックで最終値を算出（よく使う姓名は計算済みファイルから引く）
+        hit = warm.get(family, given) if warm is not None else None
+        res = hit.to_dict() if hit is not None else calc(family, given, table)
+        timer.lap("calc")
 
         # 計算式を作るため、ここでもう一度パーツ別に構築
         f = normalize_name(family)
@@ -114,6 +203,7 @@ if submitted:
 
         # オール（総格）: 姓+名（霊数は含めない）
         all_terms = term_char_list(fchars) + term_char_list(gchars)
+        timer.lap("formula")
 
         # ====== 画面表示 ======
         st.subheader("結果（値）")
@@ -151,13 +241,62 @@ if submitted:
 
         # 文字内訳（霊数も列に出すが、オールには含めない旨を注記）
         st.subheader("文字ごとの内訳（霊数は総格に含めません）")
+        timer.lap("render")
         rows = []
         for kind, strokes, ch in res["内訳"]:
             rows.append({"区分": kind, "文字": ch, "画数": strokes})
         df = pd.DataFrame(rows)
+        timer.lap("dataframe")
         st.dataframe(df, use_container_width=True)
+        timer.lap("render")
+
+        # 1リクエスト1行のログと、セッション内の集計
+        record = {
+            "stages_ms": {k: round(v, 3) for k, v in timer.stages.items()},
+            "total_ms": round(timer.total(), 3),
+            "dict_version": dict_ver,
+            "cache_hit": cache_hit,
+            "warm_hit": hit is not None,
+            "warm_open_ms": round(warm_ms, 3),
+        }
+        log.info(json.dumps(record, ensure_ascii=False))
+        history = st.session_state.setdefault("diag_history", [])
+        history.append(record)
+        del history[:-DIAG_HISTORY]
+        if show_diag:
+            render_diagnostics(record, history)
 
     except Exception as e:
         st.error(f"エラーが発生しました: {e}")
 
 
+# ====== 読みから探す ======
+st.divider()
+st.subheader("読みから漢字を探す")
+with st.form("reading"):
+    col1, col2 = st.columns(2)
+    with col1:
+        r_family = st.text_input("姓", value="", key="r_family")
+    with col2:
+        r_reading = st.text_input("名の読み（ひらがな）", value="", key="r_reading", placeholder="はると")
+    r_submitted = st.form_submit_button("探す")
+
+if r_submitted and r_reading.strip():
+    try:
+        table, _, _ = get_dict()
+        trie = get_trie()
+        if not trie:
+            st.info("辞書の readings 列が空です。kanji_readings.py ingest で読みを取り込んでください。")
+        else:
+            found = search_reading(r_reading, r_family, table, trie)
+            if not found:
+                st.info("該当する漢字が見つかりませんでした。")
+            else:
+                df = pd.DataFrame([
+                    {"名": g, **{k: res[k] for k in ("トップ（天格）", "ハート（人格）", "フット（地格）", "サイド", "オール（総格）")}}
+                    for g, res in found
+                ])
+                st.caption(f"{len(found)}件")
+                st.dataframe(df, use_container_width=True)
+    except Exception as e:
+        st.error(f"エラーが発生しました: {e}")
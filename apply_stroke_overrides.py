@@ -1,5 +1,7 @@
 import argparse, json, pandas as pd
 
+from seimei_profiling import add_profile_args, profiled
+
 # 入力CSV: kanji, strokes_old, strokes_new, element, readings, notes
 # ルールJSONの例:
 # {
@@ -72,5 +74,7 @@ if __name__ == "__main__":
     ap.add_argument("input_csv")
     ap.add_argument("rules_json")
     ap.add_argument("--output", default="output.csv")
+    add_profile_args(ap)
     args = ap.parse_args()
-    main(args.input_csv, args.rules_json, args.output)
+    with profiled(args, "apply_stroke_overrides"):
+        main(args.input_csv, args.rules_json, args.output)
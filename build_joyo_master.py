@@ -1,6 +1,8 @@
 
 import argparse, csv, json, time, urllib.request, urllib.parse, sys
 
+from seimei_profiling import add_profile_args, profiled
+
 JOYO_URL = "https://kanjiapi.dev/v1/kanji/joyo"
 KANJI_URL = "https://kanjiapi.dev/v1/kanji/"  # + <kanji>
 
@@ -66,5 +68,7 @@ if __name__ == "__main__":
     ap.add_argument("--output", default="kanji_master_joyo.csv")
     ap.add_argument("--fill-strokes", action="store_true", help="標準画数も同時取得して strokes_old に入れる")
     ap.add_argument("--delay", type=float, default=0.05, help="API呼び出し間隔秒")
+    add_profile_args(ap)
     args = ap.parse_args()
-    main(args.output, args.fill_strokes, args.delay)
+    with profiled(args, "build_joyo_master"):
+        main(args.output, args.fill_strokes, args.delay)
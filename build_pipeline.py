@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+import argparse
+import csv
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# 辞書ビルドの各段を「入力ファイル → 出力ファイル」の段として並べ、
+# 入力の内容ハッシュ（+ 段のスクリプトと引数）が前回と同じ段は実行しない。
+#
+#   joyo     : build_joyo_master.py          → joyo.csv          （--source 指定時は省略）
+#   strokes  : fill_strokes_from_kanjiapi.py → with_std.csv      （--source 指定時は省略）
+#   rules    : apply_stroke_overrides.py     → ruled.csv
+#   compile  : ruled.csv + kanji_overrides.csv → kanji_compiled.csv（最終成果物）
+#
+# 使い方例:
+# python build_pipeline.py --source kanji_master_joyo.csv
+# python build_pipeline.py --fill-strokes            # kanjiapi から作り直す
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BUILD_DIR = "build"
+STATE_FILE = ".pipeline_state.json"
+COMPILED_FILE = "kanji_compiled.csv"
+
+
+class Stage(NamedTuple):
+    name: str
+    inputs: List[str]           # 内容ハッシュを取るファイル
+    outputs: List[str]
+    run: Callable[[], None]
+    params: Dict[str, object]   # 出力に影響する引数（ハッシュに含める）
+    script: Optional[str] = None  # 段の実装ファイル（変更されたら作り直す）
+
+
+# ====== ハッシュ ======
+def file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def stage_key(st: Stage) -> str:
+    h = hashlib.sha256()
+    h.update(st.name.encode("utf-8"))
+    h.update(json.dumps(st.params, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    for p in st.inputs + ([st.script] if st.script else []):
+        h.update(p.encode("utf-8"))
+        h.update(file_hash(p).encode("ascii"))
+    return h.hexdigest()
+
+
+# ====== 状態 ======
+def load_state(build_dir: str) -> Dict[str, dict]:
+    try:
+        with open(os.path.join(build_dir, STATE_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def save_state(build_dir: str, state: Dict[str, dict]) -> None:
+    path = os.path.join(build_dir, STATE_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+def is_fresh(st: Stage, key: str, state: Dict[str, dict]) -> bool:
+    """前回と同じキーで、出力が前回書いた内容のまま残っていれば実行不要"""
+    prev = state.get(st.name)
+    if not prev or prev.get("key") != key:
+        return False
+    outs = prev.get("outputs", {})
+    return all(os.path.exists(p) and outs.get(p) == file_hash(p) for p in st.outputs)
+
+
+# ====== 最終段: コンパイル ======
+def compile_table(master_csv: str, overrides_csv: str, out_csv: str) -> int:
+    """マスタの strokes_old に kanji_overrides.csv を重ね、kanji, strokes_old の2列で書き出す"""
+    from seimei_calc import load_dict
+
+    table = load_dict(master_csv)
+    if os.path.exists(overrides_csv):
+        with open(overrides_csv, "r", encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                ch = (row.get("char") or "").strip()
+                v = (row.get("strokes") or "").strip()
+                if ch and v:
+                    try:
+                        table[ch] = int(v)
+                    except ValueError:
+                        pass
+    tmp = out_csv + ".tmp"
+    with open(tmp, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["kanji", "strokes_old"])
+        for ch in sorted(table):
+            w.writerow([ch, table[ch]])
+    os.replace(tmp, out_csv)
+    return len(table)
+
+
+# ====== 段の組み立て ======
+def build_stages(
+    build_dir: str,
+    source: Optional[str],
+    rules_json: str,
+    overrides_csv: str,
+    fill_strokes: bool,
+    delay: float,
+) -> List[Stage]:
+    def out(name: str) -> str:
+        return os.path.join(build_dir, name)
+
+    stages: List[Stage] = []
+    if source:
+        master = source
+    else:
+        def run_joyo():
+            import build_joyo_master
+            build_joyo_master.main(out("joyo.csv"), False, delay)
+
+        def run_strokes():
+            import fill_strokes_from_kanjiapi
+            fill_strokes_from_kanjiapi.main(out("joyo.csv"), out("with_std.csv"), delay)
+
+        stages.append(Stage("joyo", [], [out("joyo.csv")], run_joyo, {},
+                            os.path.join(HERE, "build_joyo_master.py")))
+        if fill_strokes:
+            stages.append(Stage("strokes", [out("joyo.csv")], [out("with_std.csv")], run_strokes, {},
+                                os.path.join(HERE, "fill_strokes_from_kanjiapi.py")))
+            master = out("with_std.csv")
+        else:
+            master = out("joyo.csv")
+
+    def run_rules():
+        import apply_stroke_overrides
+        apply_stroke_overrides.main(master, rules_json, out("ruled.csv"))
+
+    def run_compile():
+        n = compile_table(out("ruled.csv"), overrides_csv, out(COMPILED_FILE))
+        print(f"書き出し: {out(COMPILED_FILE)} / {n}件")
+
+    stages.append(Stage("rules", [master, rules_json], [out("ruled.csv")], run_rules, {},
+                        os.path.join(HERE, "apply_stroke_overrides.py")))
+    # kanji_overrides.csv は任意（なければ入力に含めない）
+    compile_inputs = [out("ruled.csv")]
+    if os.path.exists(overrides_csv):
+        compile_inputs.append(overrides_csv)
+    stages.append(Stage("compile", compile_inputs, [out(COMPILED_FILE)], run_compile, {},
+                        os.path.abspath(__file__)))
+    return stages
+
+
+def run_pipeline(stages: List[Stage], build_dir: str, force: bool = False) -> List[str]:
+    """段を順に実行し、実際に実行した段の名前を返す"""
+    os.makedirs(build_dir, exist_ok=True)
+    state = load_state(build_dir)
+    ran: List[str] = []
+    for st in stages:
+        key = stage_key(st)
+        if not force and is_fresh(st, key, state):
+            print(f"[skip] {st.name}")
+            continue
+        t0 = time.perf_counter()
+        st.run()
+        dt = time.perf_counter() - t0
+        state[st.name] = {
+            "key": key,
+            "outputs": {p: file_hash(p) for p in st.outputs},
+        }
+        save_state(build_dir, state)
+        ran.append(st.name)
+        print(f"[run]  {st.name} ({dt * 1000:.1f} ms)")
+    return ran
+
+
+def main():
+    ap = argparse.ArgumentParser(description="辞書ビルドを段ごとに内容ハッシュでキャッシュして実行")
+    ap.add_argument("--source", default=None,
+                    help="既存のマスタCSVから始める（省略時は kanjiapi から常用漢字を取得）")
+    ap.add_argument("--rules", default=os.path.join(HERE, "stroke_rules_my_rules_v1.json"))
+    ap.add_argument("--overrides", default=os.path.join(HERE, "kanji_overrides.csv"))
+    ap.add_argument("--build-dir", default=os.path.join(HERE, BUILD_DIR))
+    ap.add_argument("--fill-strokes", action="store_true", help="kanjiapi から標準画数も取得する")
+    ap.add_argument("--delay", type=float, default=0.15, help="API呼び出し間隔秒")
+    ap.add_argument("--force", action="store_true", help="キャッシュを無視して全段を実行")
+    args = ap.parse_args()
+
+    stages = build_stages(args.build_dir, args.source, args.rules, args.overrides,
+                          args.fill_strokes, args.delay)
+    ran = run_pipeline(stages, args.build_dir, args.force)
+    print(f"完了: {len(ran)}/{len(stages)} 段を実行 → {os.path.join(args.build_dir, COMPILED_FILE)}")
+
+if __name__ == "__main__":
+    main()
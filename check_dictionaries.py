@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+# 辞書まわりのファイル（マスタCSV・kanji_overrides.csv・ルールJSON・部首CSV・異体字の表）を
+# 一度ずつ読み込んで索引にし、食い違い・重複・欠落をまとめて報告する。
+#
+# 使い方例:
+# python check_dictionaries.py            # 問題があれば終了コード1（ERROR のみ）
+# python check_dictionaries.py --strict   # WARN でも終了コード1
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PRIMARY_MASTER = "kanji_master_joyo.csv"          # seimei_calc が使う辞書
+EXTRA_MASTERS = "seimei handan/kanji_master_*.csv"
+OVERRIDES_FILE = "kanji_overrides.csv"
+RULES_FILES = ("stroke_rules_my_rules_v1.json", "seimei handan/stroke_rules_my_rules_v1.json")
+RADICALS_FILE = "radicals_master_fixed.csv"
+KANJI_RADICALS_FILE = "kanji_radicals_fixed.csv"
+VARIANTS_FILE = "kanji_variants.csv"              # seimei_calc.VARIANT_MAP と合わせて normalize_name が使う
+OLD_STROKES_FILE = "kanji_old_strokes.csv"        # 旧字体の画数（to_old で写す旧字体の一覧を兼ねる）
+
+ERROR, WARN, INFO = "ERROR", "WARN", "INFO"
+
+Issue = Tuple[str, str, str]   # (レベル, 分類, 内容)
+
+
+# ====== ローダ ======
+def _read_csv(path: str) -> List[Dict[str, str]]:
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return [{(k or "").strip(): (v or "").strip() for k, v in row.items()} for row in csv.DictReader(f)]
+
+def _to_int(v: str):
+    try:
+        return int(v)
+    except ValueError:
+        return None
+
+def _rel(path: str) -> str:
+    return os.path.relpath(path, HERE)
+
+
+# ====== マスタ ======
+def check_masters(paths: List[str]) -> Tuple[List[Issue], Dict[str, Dict[str, int]]]:
+    """
+    各マスタの重複・空欄を調べ、文字→{マスタ: 画数} の索引を返す。
+    索引はマスタ間の食い違いと他の層の欠落チェックに使う。
+    """
+    issues: List[Issue] = []
+    index: Dict[str, Dict[str, int]] = {}
+    for p in paths:
+        name = _rel(p)
+        seen: Dict[str, int] = {}
+        blank = []
+        for row in _read_csv(p):
+            k = row.get("kanji", "")
+            if not k:
+                continue
+            v = _to_int(row.get("strokes_old", ""))
+            if k in seen:
+                level = WARN if seen[k] == v else ERROR
+                issues.append((level, "master-duplicate", f"{name}: {k} が複数行あります ({seen[k]}, {v})"))
+            seen[k] = v
+            if v is None:
+                blank.append(k)
+                continue
+            index.setdefault(k, {})[name] = v
+        if blank:
+            sample = "".join(blank[:20]) + ("…" if len(blank) > 20 else "")
+            issues.append((WARN, "master-blank", f"{name}: 画数が空欄/非数値 {len(blank)}字 ({sample})"))
+
+    for k, per in index.items():
+        if len(set(per.values())) > 1:
+            detail = ", ".join(f"{n}={v}" for n, v in per.items())
+            issues.append((WARN, "master-conflict", f"{k}: {detail}"))
+    return issues, index
+
+
+# ====== kanji_overrides.csv ======
+def check_overrides(path: str, primary: Dict[str, int]) -> Tuple[List[Issue], Dict[str, int]]:
+    issues: List[Issue] = []
+    data: Dict[str, int] = {}
+    if not os.path.exists(path):
+        return issues, data
+    name = _rel(path)
+    for row in _read_csv(path):
+        ch, v = row.get("char", ""), _to_int(row.get("strokes", ""))
+        if not ch:
+            continue
+        if v is None:
+            issues.append((ERROR, "override-invalid", f"{name}: {ch} の画数が数値ではありません"))
+            continue
+        if ch in data:
+            issues.append((ERROR if data[ch] != v else WARN, "override-duplicate",
+                           f"{name}: {ch} が複数行あります ({data[ch]}, {v})"))
+        data[ch] = v
+        if ch not in primary:
+            issues.append((WARN, "override-missing", f"{name}: {ch} は {PRIMARY_MASTER} にありません"))
+        elif primary[ch] == v:
+            issues.append((INFO, "override-redundant", f"{name}: {ch}={v} はマスタと同じ値です"))
+    return issues, data
+
+
+# ====== ルールJSON ======
+def check_rules(path: str, primary: Dict[str, int], overrides: Dict[str, int]) -> List[Issue]:
+    issues: List[Issue] = []
+    if not os.path.exists(path):
+        return issues
+    name = _rel(path)
+    with open(path, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+
+    groups: Dict[str, List[int]] = {}   # 文字 → 含まれるグループ番号
+    for gi, grp in enumerate(rules.get("relative_groups", [])):
+        counts: Dict[str, int] = {}
+        for ch in grp.get("chars", ""):
+            counts[ch] = counts.get(ch, 0) + 1
+        dups = [f"{ch}×{n}" for ch, n in counts.items() if n > 1]
+        if dups:
+            issues.append((WARN, "rules-duplicate", f"{name}: group[{gi}] に重複 {' '.join(dups)}"))
+        for ch in counts:
+            groups.setdefault(ch, []).append(gi)
+
+    absolute = rules.get("absolute_overrides", {})
+    for ch, gis in groups.items():
+        if len(gis) > 1:
+            issues.append((WARN, "rules-multi-group", f"{name}: {ch} が複数グループ {gis} にあり加算が重なります"))
+        if ch in absolute:
+            issues.append((WARN, "rules-shadowed", f"{name}: {ch} は absolute_overrides で上書きされ相対値が無効です"))
+    missing = [ch for ch in list(groups) + list(absolute) if ch not in primary]
+    if missing:
+        issues.append((WARN, "rules-missing", f"{name}: {PRIMARY_MASTER} にない文字 {''.join(missing)}（適用されません）"))
+    for ch, v in absolute.items():
+        if ch in overrides and overrides[ch] != int(v):
+            issues.append((ERROR, "rules-vs-override",
+                           f"{name}: {ch}={v} と {OVERRIDES_FILE} の {overrides[ch]} が食い違います"))
+    return issues
+
+
+# ====== 異体字 ======
+def check_variants(
+    maps: Dict[str, Dict[str, str]],
+    primary: Dict[str, int],
+    complete: Optional[str] = None,
+) -> List[Issue]:
+    """
+    maps は 層の名前 → 異体字→写像先（後の層ほど優先して重ねられる）。
+    complete を渡すと、variant-missing はその層に無い項目だけを報告する（すべての層に揃っている必要はない場合）。
+    """
+    issues: List[Issue] = []
+    merged: Dict[str, Dict[str, str]] = {}
+    combined: Dict[str, str] = {}
+    for m in maps.values():
+        combined.update(m)
+    for mod, m in maps.items():
+        for src, dst in m.items():
+            merged.setdefault(src, {})[mod] = dst
+            nf = unicodedata.normalize("NFKC", src)
+            if nf != src:
+                # normalize_name は NFKC の後に VARIANT_MAP を引くので、この項目は使われない
+                issues.append((WARN, "variant-dead",
+                               f"{mod}: {src}(U+{ord(src):04X}) は NFKC で {nf}(U+{ord(nf):04X}) になり参照されません"))
+            if dst == src or dst == nf:
+                issues.append((WARN, "variant-identity", f"{mod}: {src}→{dst} は同一字への写像です"))
+            elif nf != src:
+                # 互換漢字の写像先は NFKC の結果（同じ字）であるべき
+                issues.append((ERROR, "variant-wrong",
+                               f"{mod}: {src}(U+{ord(src):04X})→{dst}(U+{ord(dst):04X}) は"
+                               f" 正規化形 {nf}(U+{ord(nf):04X}) と別の字です"))
+            elif dst in combined and combined[dst] != dst:
+                issues.append((ERROR, "variant-not-idempotent",
+                               f"{mod}: {src}→{dst}→{combined[dst]}（2回適用で結果が変わります）"))
+            if dst not in primary:
+                issues.append((WARN, "variant-target-missing", f"{mod}: {src}→{dst} の {dst} は {PRIMARY_MASTER} にありません"))
+            if src in primary:
+                # 辞書にある字を写像すると、その字の画数は使われなくなる
+                issues.append((WARN, "variant-shadowed", f"{mod}: {src} は {PRIMARY_MASTER} にあるのに {dst} へ写像されます"))
+    for src, per in merged.items():
+        if len(set(per.values())) > 1:
+            detail = ", ".join(f"{mod}={dst}" for mod, dst in per.items())
+            issues.append((ERROR, "variant-conflict", f"{src}: モジュールごとに写像先が違います ({detail})"))
+        elif complete is not None and complete not in per:
+            issues.append((INFO, "variant-missing", f"{src}→{next(iter(per.values()))} が {complete} にありません"))
+        elif complete is None and len(per) < len(maps):
+            lacking = ", ".join(mod for mod in maps if mod not in per)
+            issues.append((INFO, "variant-missing", f"{src}→{next(iter(per.values()))} が {lacking} にありません"))
+    return issues
+
+def check_variant_rows(path: str) -> Tuple[List[Issue], Dict[str, str]]:
+    """
+    kanji_variants.csv の行の重複を調べ、生の 異体字→写像先 を返す。
+    seimei_calc.load_variants と同じく後の行が優先されるので、重複は報告しておく。
+    """
+    issues: List[Issue] = []
+    m: Dict[str, str] = {}
+    if not os.path.exists(path):
+        return issues, m
+    name = _rel(path)
+    for row in _read_csv(path):
+        src, dst = row.get("variant", ""), row.get("target", "")
+        if not src or not dst:
+            continue
+        if src in m:
+            if m[src] == dst:
+                issues.append((WARN, "variant-row-duplicate", f"{name}: {src}→{dst} が複数行あります"))
+            else:
+                issues.append((ERROR, "variant-row-conflict",
+                               f"{name}: {src} の写像先が行ごとに違います ({m[src]} / {dst}、後の行が使われます)"))
+        m[src] = dst
+    return issues, m
+
+def _load_variant_maps(csv_map: Dict[str, str], variants_path: str) -> Dict[str, Dict[str, str]]:
+    """
+    normalize_name が重ねる層ごとの生の表（kanji_variants.csv の上に seimei_calc.VARIANT_MAP）。
+    seimei_cli / seimei_calc_debug も seimei_calc の normalize_name を使う。
+    """
+    import seimei_calc
+    return {_rel(variants_path): csv_map, "seimei_calc.VARIANT_MAP": dict(seimei_calc.VARIANT_MAP)}
+
+
+def check_old_strokes(path: str, variants: Dict[str, str], primary: Dict[str, int]) -> List[Issue]:
+    """
+    kanji_old_strokes.csv の画数と、旧字体（この表の字）と 異体字の表 の対応を調べる。
+    to_old は 新字体 → 旧字体 が1つに決まる字だけを写すので、同じ新字体の旧字体が2つあれば報告する。
+    """
+    issues: List[Issue] = []
+    if not os.path.exists(path):
+        issues.append((WARN, "old-strokes-missing", f"{_rel(path)} がありません（to_old で旧字体に写りません）"))
+        return issues
+    name = _rel(path)
+    olds: Dict[str, List[str]] = {}
+    seen = set()
+    for row in _read_csv(path):
+        ch, v = row.get("char", ""), _to_int(row.get("strokes", ""))
+        if not ch:
+            continue
+        if ch in seen:
+            issues.append((WARN, "old-strokes-duplicate", f"{name}: {ch} が複数行あります"))
+        seen.add(ch)
+        if v is None or v <= 0:
+            issues.append((ERROR, "old-strokes-invalid", f"{name}: {ch} の画数が正の数ではありません"))
+        if ch in primary:
+            issues.append((INFO, "old-strokes-shadowed", f"{name}: {ch} は {PRIMARY_MASTER} にあるので辞書の画数が使われます"))
+        if ch not in variants:
+            issues.append((WARN, "old-strokes-unmapped", f"{name}: {ch} は異体字の表にないので to_old で写りません"))
+        else:
+            olds.setdefault(variants[ch], []).append(ch)
+    for new, chs in olds.items():
+        if len(chs) > 1:
+            issues.append((WARN, "old-strokes-ambiguous", f"{name}: {new} の旧字体が {'/'.join(chs)} の2つ以上あるので写しません"))
+    return issues
+
+
+# ====== 部首 ======
+def check_radicals(radicals_path: str, kanji_radicals_path: str, primary: Dict[str, int]) -> List[Issue]:
+    issues: List[Issue] = []
+    names: Dict[str, int] = {}
+    aliases: Dict[str, str] = {}
+    if os.path.exists(radicals_path):
+        rname = _rel(radicals_path)
+        for row in _read_csv(radicals_path):
+            r = row.get("radical", "")
+            if not r:
+                continue
+            if r in names:
+                issues.append((ERROR, "radical-duplicate", f"{rname}: {r} が複数行あります"))
+            if _to_int(row.get("strokes_custom", "")) is None:
+                issues.append((ERROR, "radical-invalid", f"{rname}: {r} の strokes_custom が数値ではありません"))
+            names[r] = _to_int(row.get("strokes_custom", "")) or 0
+            for a in (row.get("aliases") or "").split("|"):
+                a = a.strip()
+                if not a:
+                    continue
+                if a in aliases and aliases[a] != r:
+                    issues.append((WARN, "radical-alias-conflict", f"{rname}: 別名 {a} が {aliases[a]} と {r} にあります"))
+                aliases[a] = r
+    if os.path.exists(kanji_radicals_path):
+        kname = _rel(kanji_radicals_path)
+        seen: Dict[str, str] = {}
+        for row in _read_csv(kanji_radicals_path):
+            ch, r = row.get("char", ""), row.get("radical", "")
+            if not ch:
+                continue
+            if ch in seen:
+                issues.append((WARN, "kanji-radical-duplicate", f"{kname}: {ch} が複数行あります"))
+            seen[ch] = r
+            if names and r not in names:
+                issues.append((ERROR, "kanji-radical-unknown", f"{kname}: {ch} の部首 {r} は {RADICALS_FILE} にありません"))
+            if ch not in primary:
+                issues.append((WARN, "kanji-radical-missing", f"{kname}: {ch} は {PRIMARY_MASTER} にありません"))
+    return issues
+
+
+def run_checks(base_dir: str = HERE) -> List[Issue]:
+    def p(name: str) -> str:
+        return os.path.join(base_dir, name)
+
+    masters = [p(PRIMARY_MASTER)] + sorted(glob.glob(p(EXTRA_MASTERS)))
+    issues, index = check_masters([m for m in masters if os.path.exists(m)])
+    primary_name = _rel(p(PRIMARY_MASTER))
+    primary = {k: per[primary_name] for k, per in index.items() if primary_name in per}
+
+    ov_issues, overrides = check_overrides(p(OVERRIDES_FILE), primary)
+    issues += ov_issues
+    for r in RULES_FILES:
+        issues += check_rules(p(r), primary, overrides)
+    row_issues, csv_map = check_variant_rows(p(VARIANTS_FILE))
+    issues += row_issues
+    variant_maps = _load_variant_maps(csv_map, p(VARIANTS_FILE))
+    issues += check_variants(variant_maps, primary, complete=_rel(p(VARIANTS_FILE)))
+    combined = {src: dst for m in variant_maps.values() for src, dst in m.items()}
+    issues += check_old_strokes(p(OLD_STROKES_FILE), combined, primary)
+    issues += check_radicals(p(RADICALS_FILE), p(KANJI_RADICALS_FILE), primary)
+    return issues
+
+
+def main():
+    ap = argparse.ArgumentParser(description="辞書ファイル間の整合性チェック")
+    ap.add_argument("--strict", action="store_true", help="WARN でも終了コード1にする")
+    ap.add_argument("--quiet", "-q", action="store_true", help="INFO を表示しない")
+    ap.add_argument("--only", nargs="*", default=None, help="表示する分類（例: rules-duplicate variant-dead）")
+    args = ap.parse_args()
+
+    issues = run_checks()
+    counts = {ERROR: 0, WARN: 0, INFO: 0}
+    for level, cat, msg in issues:
+        counts[level] += 1
+        if args.quiet and level == INFO:
+            continue
+        if args.only is not None and cat not in args.only:
+            continue
+        print(f"[{level}] {cat}: {msg}")
+    print(f"\nERROR {counts[ERROR]} / WARN {counts[WARN]} / INFO {counts[INFO]}")
+
+    if counts[ERROR] or (args.strict and counts[WARN]):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
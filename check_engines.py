@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+import seimei_calc
+from seimei_calc import GRID_FIELDS, GRID_KEYS, dictionary_snapshot, load_dict, normalize_name
+
+# 5格の計算の実装どうしを突き合わせる。
+# 名前の形（姓・名の文字数 × 々・異体字・辞書にない字を含むか）ごとにコーパスを作り、
+# 参照実装（seimei_calc.calc）と各エンジンの結果を比べて、食い違いを形ごとにまとめる。
+# あわせてエンジンごとのスループット（件/秒）を測る。
+#
+# 旧実装（seimei_cli.calc / seimei_calc_debug.calc）は霊数やサイドの定義が違うので、
+# 食い違いは報告するが終了コードには反映しない（strict=False）。
+# 新しいエンジンは ENGINES に足す。strict なエンジンが1件でも食い違えば終了コード1。
+#
+# 使い方例:
+# python check_engines.py
+# python check_engines.py --per-shape 500 --engines batch vector --examples 5
+# python check_engines.py --json engines.json
+
+Name = Tuple[str, str]
+Fields = Dict[str, Any]
+
+REFERENCE = "calc"
+MAX_LEN = 4          # 姓・名それぞれの最大文字数
+PER_SHAPE = 200      # 形ごとの件数
+EXAMPLES = 3         # 形ごとに表示する食い違いの例
+KINDS = ("plain", "repeat", "variant", "unknown")
+UNKNOWN_CHARS = "あカヰ〆丼"   # 常用漢字の辞書にない字
+
+
+class Engine(NamedTuple):
+    name: str
+    run: Callable[[List[Name], Dict[str, int]], list]   # 名前の列 → 実装ごとの結果の列
+    fields: Callable[[Name, Any], Fields]               # (入力の姓名, 結果) → 比べる欄
+    strict: bool = True                                 # 参照と一致すべきか
+
+
+# ====== エンジン ======
+def _grid_fields(res) -> Fields:
+    return {c: res[k] for c, k in zip(GRID_FIELDS, GRID_KEYS)}
+
+def _ref_fields(name: Name, res) -> Fields:
+    out = _grid_fields(res)
+    out["name"] = (normalize_name(name[0]), normalize_name(name[1]))
+    return out
+
+def _compact_fields(name: Name, res) -> Fields:
+    out = dict(zip(GRID_FIELDS, res.grids))
+    out["name"] = (res.family, res.given)
+    return out
+
+def _legacy_fields(name: Name, res) -> Fields:
+    f, g, top, heart, foot, side, allv = res
+    return {"name": (f, g), "top": top, "heart": heart, "foot": foot, "side": side, "allv": allv}
+
+def _run_calc(names: List[Name], table: Dict[str, int]) -> list:
+    return [seimei_calc.calc(f, g, table) for f, g in names]
+
+def _run_compact(names: List[Name], table: Dict[str, int]) -> list:
+    return [seimei_calc.calc_compact(f, g, table) for f, g in names]
+
+def _run_batch(names: List[Name], table: Dict[str, int]) -> list:
+    from seimei_batch import SignatureCache, score_batch
+    return score_batch(names, table, cache=SignatureCache())[0]
+
+def _run_batch_compact(names: List[Name], table: Dict[str, int]) -> list:
+    from seimei_batch import SignatureCache, score_batch
+    return score_batch(names, table, cache=SignatureCache(), compact=True)[0]
+
+def _run_batch_grids(names: List[Name], table: Dict[str, int]) -> list:
+    from seimei_batch import SignatureCache, score_grids
+    return score_grids(names, table, SignatureCache())
+
+def _run_vector(names: List[Name], table: Dict[str, int]) -> list:
+    from seimei_vector import score_grids
+    return score_grids(names, table).tolist()
+
+def _run_cli(names: List[Name], table: Dict[str, int]) -> list:
+    import seimei_cli
+    # 旧実装は kanji_overrides.csv を知らないので、重ねた後の表を渡して画数の条件を揃える
+    snap = dictionary_snapshot(table)
+    return [seimei_cli.calc(f, g, snap) for f, g in names]
+
+def _run_debug(names: List[Name], table: Dict[str, int]) -> list:
+    import seimei_calc_debug
+    snap = dictionary_snapshot(table)
+    return [seimei_calc_debug.calc(f, g, snap) for f, g in names]
+
+ENGINES: Dict[str, Engine] = {e.name: e for e in (
+    Engine("calc", _run_calc, _ref_fields),
+    Engine("calc_compact", _run_compact, _compact_fields),
+    Engine("batch", _run_batch, lambda n, r: _grid_fields(r)),
+    Engine("batch_compact", _run_batch_compact, _compact_fields),
+    Engine("batch_grids", _run_batch_grids, lambda n, r: dict(zip(GRID_FIELDS, r))),
+    Engine("vector", _run_vector, lambda n, r: dict(zip(GRID_FIELDS, r))),
+    Engine("cli", _run_cli, _legacy_fields, strict=False),
+    Engine("debug", _run_debug, _legacy_fields, strict=False),
+)}
+
+
+# ====== コーパス ======
+def variant_chars() -> List[str]:
+    """normalize_name が写像する字（異体字の表 + VARIANT_MAP）"""
+    return sorted(c for c in seimei_calc.load_variants() if len(c) == 1)
+
+def _make_part(rnd: random.Random, n: int, kind: str, chars: List[str], variants: List[str]) -> str:
+    s = rnd.choices(chars, k=n)
+    if kind == "repeat" and n >= 2:
+        s[rnd.randrange(1, n)] = seimei_calc.REPEAT_MARK
+    elif kind == "variant":
+        s[rnd.randrange(n)] = rnd.choice(variants)
+    elif kind == "unknown":
+        s[rnd.randrange(n)] = rnd.choice(UNKNOWN_CHARS)
+    return "".join(s)
+
+def generate_corpus(
+    table: Dict[str, int],
+    per_shape: int = PER_SHAPE,
+    max_len: int = MAX_LEN,
+    seed: int = 0,
+) -> List[Tuple[str, Name]]:
+    """
+    形ごとに per_shape 件の (形, (姓, 名)) を作る。形は「姓の文字数+名の文字数/種類」。
+    種類が plain 以外なら、姓か名のどちらかに 々・異体字・辞書にない字を1つ混ぜる。
+    """
+    rnd = random.Random(seed)
+    chars = sorted(table)
+    variants = variant_chars()
+    out: List[Tuple[str, Name]] = []
+    for fn in range(1, max_len + 1):
+        for gn in range(1, max_len + 1):
+            for kind in KINDS:
+                if kind == "repeat" and fn < 2 and gn < 2:
+                    continue
+                shape = f"{fn}+{gn}/{kind}"
+                for _ in range(per_shape):
+                    # 特別な字を混ぜる側（々 は2文字以上の側だけ）
+                    side = rnd.randrange(2)
+                    if kind == "repeat":
+                        side = 0 if gn < 2 else 1 if fn < 2 else side
+                    f = _make_part(rnd, fn, kind if side == 0 else "plain", chars, variants)
+                    g = _make_part(rnd, gn, kind if side == 1 else "plain", chars, variants)
+                    out.append((shape, (f, g)))
+    return out
+
+
+# ====== 突き合わせ ======
+def run_engine(engine: Engine, names: List[Name], table: Dict[str, int]) -> Tuple[List[Fields], float]:
+    """エンジンを1回通し、(比べる欄の列, 秒) を返す（欄への変換は時間に含めない）"""
+    t0 = time.perf_counter()
+    raw = engine.run(names, table)
+    elapsed = time.perf_counter() - t0
+    return [engine.fields(n, r) for n, r in zip(names, raw)], elapsed
+
+def compare(
+    shapes: List[str],
+    names: List[Name],
+    ref: List[Fields],
+    got: List[Fields],
+    examples: int = EXAMPLES,
+) -> Dict[str, dict]:
+    """形ごとの食い違い: {形: {"n", "divergent", "fields": {欄: 件数}, "examples": [...]}}"""
+    report: Dict[str, dict] = {}
+    for shape, name, r, g in zip(shapes, names, ref, got):
+        rep = report.setdefault(shape, {"n": 0, "divergent": 0, "fields": {}, "examples": []})
+        rep["n"] += 1
+        diff = {k: (r[k], v) for k, v in g.items() if k in r and r[k] != v}
+        if not diff:
+            continue
+        rep["divergent"] += 1
+        for k in diff:
+            rep["fields"][k] = rep["fields"].get(k, 0) + 1
+        if len(rep["examples"]) < examples:
+            rep["examples"].append({"family": name[0], "given": name[1], "diff": diff})
+    return report
+
+def check(
+    engines: List[str],
+    table: Dict[str, int],
+    per_shape: int = PER_SHAPE,
+    max_len: int = MAX_LEN,
+    seed: int = 0,
+    examples: int = EXAMPLES,
+) -> Dict[str, dict]:
+    """参照実装と各エンジンを同じコーパスで走らせ、エンジンごとの結果を返す"""
+    corpus = generate_corpus(table, per_shape, max_len, seed)
+    shapes = [s for s, _ in corpus]
+    names = [n for _, n in corpus]
+    ref, ref_sec = run_engine(ENGINES[REFERENCE], names, table)
+
+    out: Dict[str, dict] = {}
+    for name in [REFERENCE] + [e for e in engines if e != REFERENCE]:
+        engine = ENGINES[name]
+        if name == REFERENCE:
+            got, sec = ref, ref_sec
+        else:
+            try:
+                got, sec = run_engine(engine, names, table)
+            except ImportError as e:
+                out[name] = {"skipped": str(e), "strict": engine.strict}
+                continue
+        by_shape = compare(shapes, names, ref, got, examples)
+        out[name] = {
+            "strict": engine.strict,
+            "names": len(names),
+            "seconds": round(sec, 4),
+            "names_per_sec": round(len(names) / sec, 1) if sec else 0.0,
+            "divergent": sum(r["divergent"] for r in by_shape.values()),
+            "by_shape": {s: r for s, r in by_shape.items() if r["divergent"]},
+        }
+    return out
+
+
+def _fmt_diff(diff: Dict[str, Tuple[Any, Any]]) -> str:
+    return " ".join(f"{k}={a}→{b}" for k, (a, b) in diff.items())
+
+def main():
+    ap = argparse.ArgumentParser(description="5格の各実装を参照実装と突き合わせ、食い違いとスループットを報告")
+    ap.add_argument("--engines", nargs="*", default=list(ENGINES), choices=list(ENGINES))
+    ap.add_argument("--per-shape", type=int, default=PER_SHAPE, help="形ごとの件数")
+    ap.add_argument("--max-len", type=int, default=MAX_LEN, help="姓・名それぞれの最大文字数")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--examples", type=int, default=EXAMPLES, help="形ごとに表示する例の数")
+    ap.add_argument("--json", default=None, help="結果を JSON で書き出す")
+    args = ap.parse_args()
+
+    table = load_dict()
+    report = check(args.engines, table, args.per_shape, args.max_len, args.seed, args.examples)
+
+    failed = False
+    for name, r in report.items():
+        if "skipped" in r:
+            print(f"== {name}: スキップ ({r['skipped']})")
+            continue
+        tag = "" if r["strict"] else "（旧実装）"
+        print(f"== {name}{tag}: {r['names_per_sec']:,.0f} 件/秒, 食い違い {r['divergent']}/{r['names']}件")
+        for shape, s in sorted(r["by_shape"].items()):
+            fields = ", ".join(f"{k}:{v}" for k, v in sorted(s["fields"].items()))
+            print(f"   {shape:<14} {s['divergent']:>5}/{s['n']:<5} [{fields}]")
+            for ex in s["examples"]:
+                print(f"      {ex['family']} {ex['given']}: {_fmt_diff(ex['diff'])}")
+        failed = failed or (r["strict"] and r["divergent"] > 0)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n書き出し: {args.json}")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
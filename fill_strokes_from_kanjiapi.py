@@ -2,6 +2,8 @@
 import argparse, csv, json, time, sys
 import urllib.request
 
+from seimei_profiling import add_profile_args, profiled
+
 API = "https://kanjiapi.dev/v1/kanji/"  # returns JSON, includes "stroke_count"
 
 def fetch_strokes(ch: str) -> int | None:
@@ -59,5 +61,7 @@ if __name__ == "__main__":
     p.add_argument("input_csv", help="元CSV（kanji, strokes_old 列が必要）")
     p.add_argument("--output", default="kanji_master_with_std.csv", help="出力CSVのファイル名")
     p.add_argument("--delay", type=float, default=0.15, help="1件ごとの待機秒（デフォルト0.15）")
+    add_profile_args(p)
     args = p.parse_args()
-    main(args.input_csv, args.output, args.delay)
+    with profiled(args, "fill_strokes_from_kanjiapi"):
+        main(args.input_csv, args.output, args.delay)
@@ -2,6 +2,8 @@
 import argparse, csv, json, time, sys
 import urllib.request, urllib.parse
 
+from seimei_profiling import add_profile_args, profiled
+
 API = "https://kanjiapi.dev/v1/kanji/"
 
 def fetch_strokes(ch: str):
@@ -65,5 +67,7 @@ if __name__ == "__main__":
     p.add_argument("--output", default="kanji_master_with_std.csv")
     p.add_argument("--delay", type=float, default=0.10)
     p.add_argument("--quiet", action="store_true")
+    add_profile_args(p)
     args = p.parse_args()
-    main(args.input_csv, args.output, args.delay, verbose=not args.quiet)
+    with profiled(args, "fill_strokes_from_kanjiapi_verbose"):
+        main(args.input_csv, args.output, args.delay, verbose=not args.quiet)
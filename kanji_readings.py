@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+import argparse
+import csv
+import os
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from seimei_calc import DICT_FILE, calc
+
+# 読み（かな）→ 漢字 の索引。
+# 1) ingest: ローカルの KANJIDIC2（kanjidic2.xml）から音読み・訓読み・名乗りを取り、
+#    マスタCSVの readings 列に「|」区切りのひらがなで書き込む
+# 2) トライ木: 読みの1文字ずつを辿る木。節点に、そこまでの読みを持つ漢字を置く
+# 3) search: 「はると」のような読みを前から辿って分割し、漢字の綴りを列挙して5格を出す
+#
+# 使い方例:
+# python kanji_readings.py ingest kanjidic2.xml
+# python kanji_readings.py search はると --family 田中
+
+READING_SEP = "|"
+MAX_CHARS = 3      # 1つの名に使う漢字の最大数
+MAX_RESULTS = 500  # 列挙する綴りの上限
+
+
+# ====== かなの正規化 ======
+def to_hiragana(s: str) -> str:
+    return "".join(chr(ord(c) - 0x60) if "ァ" <= c <= "ヶ" else c for c in s)
+
+def clean_reading(r: str) -> str:
+    """KANJIDIC2 の読みを比較用に整える（送り仮名「.」以降と接辞の「-」を落とす）"""
+    r = r.split(".", 1)[0].replace("-", "")
+    return to_hiragana(r.strip())
+
+
+# ====== 取り込み ======
+def parse_kanjidic2(xml_path: str) -> Iterator[Tuple[str, List[str]]]:
+    """kanjidic2.xml を1字ずつ読み、(漢字, 読みのリスト) を返す（ファイル全体を木にしない）"""
+    for _, elem in ET.iterparse(xml_path, events=("end",)):
+        if elem.tag != "character":
+            continue
+        literal = elem.findtext("literal") or ""
+        readings: List[str] = []
+        for r in elem.iter("reading"):
+            if r.get("r_type") in ("ja_on", "ja_kun") and r.text:
+                readings.append(clean_reading(r.text))
+        for r in elem.iter("nanori"):
+            if r.text:
+                readings.append(clean_reading(r.text))
+        if literal:
+            yield literal, [r for r in dict.fromkeys(readings) if r]
+        elem.clear()
+
+def ingest(xml_path: str, master_csv: str) -> Tuple[int, int]:
+    """マスタCSVの readings 列を KANJIDIC2 の読みで埋める。戻り値: (更新件数, 全件数)"""
+    readings = dict(parse_kanjidic2(xml_path))
+    with open(master_csv, "r", encoding="utf-8-sig", newline="") as f:
+        rdr = csv.DictReader(f)
+        fieldnames = list(rdr.fieldnames or [])
+        rows = list(rdr)
+    if "readings" not in fieldnames:
+        fieldnames.append("readings")
+
+    updated = 0
+    for row in rows:
+        rs = readings.get((row.get("kanji") or "").strip())
+        if rs:
+            row["readings"] = READING_SEP.join(rs)
+            updated += 1
+
+    tmp = master_csv + ".tmp"
+    with open(tmp, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=fieldnames)
+        w.writeheader()
+        w.writerows(rows)
+    os.replace(tmp, master_csv)
+    return updated, len(rows)
+
+
+# ====== 索引 ======
+def load_readings(csv_path: Optional[str] = None) -> Dict[str, List[str]]:
+    """マスタCSVの readings 列を 漢字→読みのリスト で返す"""
+    path = csv_path or os.path.join(os.path.dirname(__file__), DICT_FILE)
+    out: Dict[str, List[str]] = {}
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            k = (row.get("kanji") or "").strip()
+            rs = [r for r in (row.get("readings") or "").split(READING_SEP) if r.strip()]
+            if k and rs:
+                out[k] = [to_hiragana(r.strip()) for r in rs]
+    return out
+
+def build_trie(readings: Dict[str, List[str]]) -> dict:
+    """
+    読みのトライ木。節点は dict で、かな1文字 → 子節点。
+    その節点までの読みを持つ漢字は キー "" にリストで置く。
+    """
+    root: dict = {}
+    for kanji, rs in readings.items():
+        for r in rs:
+            node = root
+            for c in r:
+                node = node.setdefault(c, {})
+            node.setdefault("", []).append(kanji)
+    return root
+
+def prefixes(trie: dict, s: str, start: int = 0) -> Iterator[Tuple[int, List[str]]]:
+    """s[start:] の先頭から辿れる読みごとに (読みの終わりの位置, 漢字のリスト) を返す"""
+    node = trie
+    for i in range(start, len(s)):
+        node = node.get(s[i])
+        if node is None:
+            return
+        if "" in node:
+            yield i + 1, node[""]
+
+def spellings(
+    reading: str,
+    trie: dict,
+    max_chars: int = MAX_CHARS,
+    limit: int = MAX_RESULTS,
+) -> List[str]:
+    """読み全体をちょうど覆う漢字の綴りを列挙する（1字ごとにトライ木を前から辿る）"""
+    reading = to_hiragana(reading.strip())
+    out: List[str] = []
+
+    def walk(pos: int, acc: str) -> None:
+        if len(out) >= limit:
+            return
+        if pos == len(reading):
+            if acc:
+                out.append(acc)
+            return
+        if len(acc) >= max_chars:
+            return
+        for end, kanji in prefixes(trie, reading, pos):
+            for k in kanji:
+                walk(end, acc + k)
+                if len(out) >= limit:
+                    return
+
+    walk(0, "")
+    return list(dict.fromkeys(out))
+
+def search(
+    reading: str,
+    family: str,
+    table: Dict[str, int],
+    trie: dict,
+    max_chars: int = MAX_CHARS,
+    limit: int = MAX_RESULTS,
+) -> List[Tuple[str, dict]]:
+    """読みに合う名の綴りごとに calc の結果を返す: [(名, 結果), ...]"""
+    return [(g, calc(family, g, table)) for g in spellings(reading, trie, max_chars, limit)]
+
+
+def main():
+    from seimei_calc import GRID_KEYS, load_dict
+
+    ap = argparse.ArgumentParser(description="読み（かな）から漢字の綴りを引く")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("ingest", help="KANJIDIC2 の読みをマスタCSVの readings 列に取り込む")
+    p.add_argument("kanjidic2_xml")
+    p.add_argument("--master", default=os.path.join(os.path.dirname(__file__), DICT_FILE))
+    p = sub.add_parser("search", help="読みから名の綴りと5格を表示")
+    p.add_argument("reading")
+    p.add_argument("--family", default="", help="姓（5格の計算に使う）")
+    p.add_argument("--max-chars", type=int, default=MAX_CHARS)
+    p.add_argument("--limit", type=int, default=MAX_RESULTS)
+    args = ap.parse_args()
+
+    if args.cmd == "ingest":
+        n, total = ingest(args.kanjidic2_xml, args.master)
+        print(f"readings 更新: {n}/{total}件 ({args.master})")
+        return
+
+    readings = load_readings()
+    if not readings:
+        print("readings 列が空です。先に ingest を実行してください。")
+        return
+    trie = build_trie(readings)
+    table = load_dict()
+    for given, res in search(args.reading, args.family, table, trie, args.max_chars, args.limit):
+        grids = " ".join(f"{k[:3]}={res[k]}" for k in GRID_KEYS if k not in ("サイド（表面）", "サイド（本質）"))
+        print(f"{args.family}{given}  {grids}")
+
+if __name__ == "__main__":
+    main()
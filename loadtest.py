@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+import argparse
+import json
+import platform
+import random
+import sys
+import threading
+import time
+import tracemalloc
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from seimei_calc import calc, dictionary_version, load_dict
+from seimei_timing import summarize
+
+try:
+    import resource   # Windows にはない
+except ImportError:
+    resource = None
+
+# 採点の入口（calc 単体・一括エンジン・画数列キャッシュ・numpy 一括・ローカルHTTP）に名前コーパスを流し、
+# スループット・レイテンシ分位点・メモリの最大値を JSON で出す。
+#
+# 使い方例:
+# python loadtest.py --target calc --requests 20000 --concurrency 4
+# python loadtest.py --target batch --corpus names.csv --batch-size 1000
+# python loadtest.py --target signature --corpus names.csv --batch-size 1000
+# python loadtest.py --target vector --corpus names.csv --batch-size 10000
+# python loadtest.py --target http --url "http://localhost:8000/calc" --concurrency 16
+# python loadtest.py --target calc --output runs/2026-10-19.json
+#
+# HTTP は GET <url>?family=..&given=.. を送り、2xx を成功とみなす。
+# signature は seimei_batch.score_grids（画数列キャッシュ、5格だけ）、
+# vector は seimei_vector.score_grids（numpy の一括計算）を呼ぶ。
+
+TARGETS = ("calc", "batch", "signature", "vector", "http")
+Name = Tuple[str, str]
+
+
+# ====== コーパス ======
+def synthetic_corpus(table: Dict[str, int], n: int, seed: int = 0) -> List[Name]:
+    """辞書の字から 姓1〜3字・名1〜3字 の名前を作る（seed 固定で再現可能）"""
+    rnd = random.Random(seed)
+    chars = sorted(table)
+    return [
+        ("".join(rnd.choices(chars, k=rnd.choice((1, 2, 2, 3)))),
+         "".join(rnd.choices(chars, k=rnd.choice((1, 2, 2, 3)))))
+        for _ in range(n)
+    ]
+
+
+# ====== 対象 ======
+def make_target(
+    kind: str,
+    table: Dict[str, int],
+    url: Optional[str] = None,
+    timeout: float = 10.0,
+) -> Callable[[Sequence[Name]], int]:
+    """名前の塊を受け取って処理し、処理件数を返す関数を作る"""
+    if kind == "calc":
+        def run(chunk: Sequence[Name]) -> int:
+            for family, given in chunk:
+                calc(family, given, table)
+            return len(chunk)
+    elif kind == "batch":
+        from seimei_batch import score_batch
+
+        def run(chunk: Sequence[Name]) -> int:
+            results, _ = score_batch(chunk, table)
+            return len(results)
+    elif kind == "signature":
+        from seimei_batch import score_grids
+
+        def run(chunk: Sequence[Name]) -> int:
+            return len(score_grids(chunk, table))
+    elif kind == "vector":
+        from seimei_vector import score_grids as vector_grids
+
+        def run(chunk: Sequence[Name]) -> int:
+            return len(vector_grids(chunk, table))
+    elif kind == "http":
+        if not url:
+            raise ValueError("--target http には --url が必要です")
+
+        def run(chunk: Sequence[Name]) -> int:
+            for family, given in chunk:
+                q = urllib.parse.urlencode({"family": family, "given": given})
+                with urllib.request.urlopen(f"{url}?{q}", timeout=timeout) as resp:
+                    resp.read()
+            return len(chunk)
+    else:
+        raise ValueError(f"未知の対象: {kind}")
+    return run
+
+
+# ====== 実行 ======
+def _rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    # ru_maxrss は Linux では KiB、macOS では byte
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def run_load(
+    run: Callable[[Sequence[Name]], int],
+    corpus: Sequence[Name],
+    requests: int,
+    concurrency: int = 1,
+    batch_size: int = 1,
+    warmup: int = 0,
+    trace_alloc: bool = False,
+) -> dict:
+    """
+    corpus を先頭から繰り返して requests 件を batch_size 件ずつ投げる。
+    1回の呼び出し（batch_size 件）を1リクエストとしてレイテンシを測る。
+    """
+    chunks: List[Sequence[Name]] = []
+    for i in range(0, requests, batch_size):
+        idx = [(i + j) % len(corpus) for j in range(min(batch_size, requests - i))]
+        chunks.append([corpus[k] for k in idx])
+
+    for c in chunks[:warmup]:
+        run(c)
+
+    latencies: List[float] = []
+    errors = 0
+    done = 0
+    lock = threading.Lock()
+
+    def one(chunk: Sequence[Name]) -> None:
+        nonlocal errors, done
+        t0 = time.perf_counter()
+        try:
+            n = run(chunk)
+        except Exception:
+            with lock:
+                errors += 1
+            return
+        ms = (time.perf_counter() - t0) * 1000
+        with lock:
+            latencies.append(ms)
+            done += n
+
+    if trace_alloc:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    if concurrency <= 1:
+        for c in chunks:
+            one(c)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as ex:
+            list(ex.map(one, chunks))
+    elapsed = time.perf_counter() - t0
+    peak_alloc = None
+    if trace_alloc:
+        peak_alloc = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+
+    lat = summarize(latencies)
+    rss = _rss_mb()
+    return {
+        "names": done,
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "names_per_sec": round(done / elapsed, 1) if elapsed else 0.0,
+        "requests_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {k: (round(v, 4) if isinstance(v, float) else v) for k, v in lat.items()},
+        "max_rss_mb": round(rss, 1) if rss is not None else None,
+        "peak_traced_mb": round(peak_alloc, 2) if peak_alloc is not None else None,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="採点の入口への負荷試験（結果は JSON）")
+    ap.add_argument("--target", choices=TARGETS, default="calc")
+    ap.add_argument("--corpus", default=None, help="family, given 列を持つCSV（省略時は合成コーパス）")
+    ap.add_argument("--corpus-size", type=int, default=10000, help="合成コーパスの件数")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--requests", type=int, default=None, help="投げる名前の総数（省略時はコーパス1周）")
+    ap.add_argument("--concurrency", type=int, default=1, help="同時実行スレッド数")
+    ap.add_argument("--batch-size", type=int, default=1, help="1リクエストあたりの名前数")
+    ap.add_argument("--warmup", type=int, default=0, help="計測前に捨てるリクエスト数")
+    ap.add_argument("--url", default=None, help="--target http の送り先")
+    ap.add_argument("--timeout", type=float, default=10.0)
+    ap.add_argument("--trace-alloc", action="store_true", help="tracemalloc で割り当ての最大値も測る（遅くなる）")
+    ap.add_argument("--output", default=None, help="JSON の書き出し先（省略時は標準出力。指定時は要約1行だけ表示）")
+    args = ap.parse_args()
+
+    table = load_dict()
+    if args.corpus:
+        from seimei_batch import read_names
+        corpus = list(read_names(args.corpus))
+        source = args.corpus
+    else:
+        corpus = synthetic_corpus(table, args.corpus_size, args.seed)
+        source = f"synthetic:{args.corpus_size}:{args.seed}"
+    if not corpus:
+        raise SystemExit("コーパスが空です")
+
+    run = make_target(args.target, table, args.url, args.timeout)
+    stats = run_load(
+        run, corpus,
+        requests=args.requests or len(corpus),
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        warmup=args.warmup,
+        trace_alloc=args.trace_alloc,
+    )
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "target": args.target,
+        "url": args.url,
+        "corpus": source,
+        "concurrency": args.concurrency,
+        "batch_size": args.batch_size,
+        "dict_version": dictionary_version(table),
+        "python": platform.python_version(),
+        "host": platform.node(),
+        **stats,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"書き出し: {args.output} / {report['names']}件 {report['names_per_sec']}件/秒 "
+              f"p95 {report['latency_ms']['p95']}ms")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+import argparse
+import csv
+import os
+import re
+import unicodedata
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from seimei_calc import REPEAT_MARK, dictionary_snapshot, load_dict, load_variants
+
+# 名に使える字（常用漢字 + 人名用漢字 + かな）かを調べる。
+# 使える字の集合は コードポイントのビット列（1字1ビット）で持ち、起動時に辞書から1回だけ組み立てる。
+# 名前の判定はビット列の連続区間から作った正規表現（使えない字のクラス）で行うので、
+# 1件あたりのコストは re の search 1回分。ストリーミングの集計の前段（prefilter）に挟んで使う。
+#
+# 使える字:
+#   辞書（kanji_master_joyo.csv + kanji_overrides.csv、--master で足したマスタ）にある字
+#   kanji_jinmeiyo.csv（kanji 列。戸籍法施行規則 別表第二 の人名用漢字。part 列は 一/二 の別）にある字。
+#   この一覧がないと常用漢字だけで判定することになり、蓮・湊 などがはじかれるので、なければエラーにする
+#   ひらがな・カタカナ（ゔ・ヵ・ヶ を除く）・長音符「ー」・踊り字（ゝゞヽヾ々）
+#   （allow_variants=True / --variants のときだけ）異体字の表で上の字に写る字。
+#   髙・﨑 などの異体字は戸籍に使えない字が多いので、既定では使えない字として扱う
+# 名前は NFKC で正規化してから調べる（半角カナ・全角英数は NFKC 後の字で判定）。
+#
+# 使い方例:
+# python seimei_allowed.py check names.csv --output flagged.csv   # 使えない字を含む行を書き出す
+# python seimei_allowed.py test 太郎 𠮷男 ㋿
+
+JINMEIYO_FILE = "kanji_jinmeiyo.csv"
+KANA_RANGES = (
+    (0x3041, 0x3093),   # ぁ〜ん
+    (0x309D, 0x309E),   # ゝゞ
+    (0x30A1, 0x30F4),   # ァ〜ヴ
+    (0x30FC, 0x30FE),   # ー ヽヾ
+)
+EXTRA_CHARS = REPEAT_MARK
+
+
+def _load_kanji_column(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return [(row.get("kanji") or "").strip() for row in csv.DictReader(f) if (row.get("kanji") or "").strip()]
+
+
+class AllowedChars:
+    """コードポイントのビット列。bits[cp >> 3] の (cp & 7) ビット目が 1 なら使える字"""
+
+    def __init__(self, chars: Iterable[str] = (), ranges: Iterable[Tuple[int, int]] = ()):
+        cps = {ord(c) for c in chars if len(c) == 1}
+        for lo, hi in ranges:
+            cps.update(range(lo, hi + 1))
+        bits = bytearray((max(cps, default=0) >> 3) + 1)
+        for cp in cps:
+            bits[cp >> 3] |= 1 << (cp & 7)
+        self.bits = bytes(bits)
+        self.size = len(cps)
+        self._bad = re.compile(f"[^{self._char_class()}]")
+
+    def _runs(self) -> Iterator[Tuple[int, int]]:
+        """ビットが連続して立っている区間 (先頭, 末尾)"""
+        start = None
+        for k, byte in enumerate(self.bits):
+            if start is None and byte == 0:
+                continue
+            if start is not None and byte == 0xFF:
+                continue
+            for b in range(8):
+                cp = (k << 3) + b
+                on = byte >> b & 1
+                if on and start is None:
+                    start = cp
+                elif not on and start is not None:
+                    yield start, cp - 1
+                    start = None
+        if start is not None:
+            yield start, len(self.bits) * 8 - 1
+
+    def _char_class(self) -> str:
+        parts = []
+        for lo, hi in self._runs():
+            parts.append(re.escape(chr(lo)) if lo == hi else f"{re.escape(chr(lo))}-{re.escape(chr(hi))}")
+        return "".join(parts) or "\\x00-\\x00"   # 空の集合でも正規表現として成り立つように
+
+    def __contains__(self, ch: str) -> bool:
+        cp = ord(ch)
+        return (cp >> 3) < len(self.bits) and bool(self.bits[cp >> 3] >> (cp & 7) & 1)
+
+    def is_valid(self, name: str) -> bool:
+        return self._bad.search(unicodedata.normalize("NFKC", name or "")) is None
+
+    def invalid_chars(self, name: str) -> List[str]:
+        """使えない字（NFKC 後、出てきた順に重複なし）"""
+        return list(dict.fromkeys(self._bad.findall(unicodedata.normalize("NFKC", name or ""))))
+
+
+def load_allowed(
+    table: Dict[str, int],
+    masters: Iterable[str] = (),
+    jinmeiyo_path: Optional[str] = None,
+    allow_variants: bool = False,
+) -> AllowedChars:
+    """辞書・人名用漢字・かなから使える字のビット列を作る（人名用漢字の一覧がなければ FileNotFoundError）"""
+    chars = set(dictionary_snapshot(table, derived=False, old_forms=False))
+    for m in masters:
+        chars.update(load_dict(m))
+    path = jinmeiyo_path or os.path.join(os.path.dirname(__file__), JINMEIYO_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"人名用漢字の一覧がありません: {path}（常用漢字だけでは名に使える字を判定できません）")
+    chars.update(unicodedata.normalize("NFKC", c) for c in _load_kanji_column(path))
+    if allow_variants:
+        chars.update(src for src, dst in load_variants().items() if dst in chars)
+    chars.update(EXTRA_CHARS)
+    return AllowedChars(chars, KANA_RANGES)
+
+
+# ====== 一括・ストリーミング ======
+def flag_names(
+    names: Iterable[Tuple[str, str]],
+    allowed: AllowedChars,
+) -> Iterator[Tuple[int, str, str, List[str]]]:
+    """使えない字を含む行だけを (行番号(0始まり), 姓, 名, 名の使えない字) で返す"""
+    for i, (family, given) in enumerate(names):
+        if not allowed.is_valid(given):
+            yield i, family, given, allowed.invalid_chars(given)
+
+def prefilter(
+    names: Iterable[Tuple[str, str]],
+    allowed: AllowedChars,
+    on_reject: Optional[Callable[[str, str], None]] = None,
+) -> Iterator[Tuple[str, str]]:
+    """名に使えない字を含む行を飛ばす（on_reject を渡せば飛ばした行ごとに (姓, 名) で呼ぶ）"""
+    for family, given in names:
+        if allowed.is_valid(given):
+            yield family, given
+        elif on_reject is not None:
+            on_reject(family, given)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="名に使えない字（常用・人名用漢字・かな以外）を調べる")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("check", help="名前リストCSVで使えない字を含む行を書き出す")
+    p.add_argument("names_csv", help="family, given 列を持つCSV")
+    p.add_argument("--output", default="flagged.csv")
+    p = sub.add_parser("test", help="名を1つずつ調べる")
+    p.add_argument("names", nargs="+")
+    for p in sub.choices.values():
+        p.add_argument("--master", nargs="*", default=[], help="使える字に足すマスタCSV")
+        p.add_argument("--jinmeiyo", default=None, help=f"人名用漢字の一覧（既定: {JINMEIYO_FILE}）")
+        p.add_argument("--variants", action="store_true", help="異体字の表で使える字に写る字も使える字に含める")
+    args = ap.parse_args()
+
+    allowed = load_allowed(load_dict(), args.master, args.jinmeiyo, args.variants)
+    if args.cmd == "check":
+        from seimei_batch import read_names
+
+        n = 0
+        with open(args.output, "w", encoding="utf-8-sig", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["row", "姓", "名", "invalid_chars"])
+            for i, family, given, bad in flag_names(read_names(args.names_csv), allowed):
+                w.writerow([i + 1, family, given, "".join(bad)])
+                n += 1
+        print(f"書き出し: {args.output} / 使えない字を含む名 {n}件（使える字 {allowed.size}字）")
+    else:
+        for name in args.names:
+            bad = allowed.invalid_chars(name)
+            print(f"{name}: " + ("OK" if not bad else "使えない字 " + " ".join(f"{c}(U+{ord(c):04X})" for c in bad)))
+
+if __name__ == "__main__":
+    main()
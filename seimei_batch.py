@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+import argparse
+import csv
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from seimei_calc import (
+    GRID_KEYS, GridResult, calc, compact_from_strokes, grids_from_strokes, load_dict, normalize_name,
+    result_from_strokes, stroke_for_char,
+)
+from seimei_profiling import add_profile_args, profiled
+
+# 入力CSV: family, given（または 姓, 名）列を持つ名前リスト
+FAMILY_COLS = ("family", "姓")
+GIVEN_COLS = ("given", "名")
+
+# 一括計算の結果: calc と同じ形の dict か、compact=True のときの GridResult
+Result = Union[dict, GridResult]
+
+
+# ====== 入力 ======
+def read_names(path: str) -> Iterator[Tuple[str, str]]:
+    """名前リストCSVを1行ずつ (姓, 名) で返す（全件をメモリに載せない）"""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        rdr = csv.DictReader(f)
+        header = [c.strip() for c in rdr.fieldnames or []]
+        fcol = next((c for c in FAMILY_COLS if c in header), None)
+        gcol = next((c for c in GIVEN_COLS if c in header), None)
+        if fcol is None or gcol is None:
+            raise RuntimeError("CSVに 'family'/'given'（または 姓/名）列が見つかりません: " + path)
+        for row in rdr:
+            r = {(k or "").strip(): (v or "").strip() for k, v in row.items()}
+            family, given = r.get(fcol, ""), r.get(gcol, "")
+            if family or given:
+                yield family, given
+
+
+# ====== 一括計算 ======
+def score_names(
+    names: Iterable[Tuple[str, str]],
+    table: Dict[str, int],
+) -> Iterator[Tuple[str, str, dict]]:
+    """(姓, 名) の列を順に calc し、(姓, 名, 結果) を返す"""
+    for family, given in names:
+        yield family, given, calc(family, given, table)
+
+
+# ====== 重複除去つきの計画 ======
+class BatchPlan(NamedTuple):
+    unique: List[Tuple[str, str]]   # 正規化済みの (姓, 名)。初出順
+    index: List[int]                # 入力の各行 → unique の添字
+    surnames: List[str]             # 正規化済みの姓（重複なし）
+    givens: List[str]               # 正規化済みの名（重複なし）
+
+def plan_batch(names: Iterable[Tuple[str, str]]) -> BatchPlan:
+    """
+    normalize_name で正規化してから姓名・姓・名をそれぞれハッシュでまとめる。
+    表記ゆれ（髙/高、々 など）も同じ組として1回だけ計算される。
+    """
+    ids: Dict[Tuple[str, str], int] = {}
+    surnames: Dict[str, None] = {}
+    givens: Dict[str, None] = {}
+    index: List[int] = []
+    for family, given in names:
+        key = (normalize_name(family), normalize_name(given))
+        i = ids.get(key)
+        if i is None:
+            i = ids[key] = len(ids)
+            surnames[key[0]] = None
+            givens[key[1]] = None
+        index.append(i)
+    return BatchPlan(list(ids), index, list(surnames), list(givens))
+
+def score_plan(plan: BatchPlan, table: Dict[str, int], compact: bool = False) -> List[Result]:
+    """
+    計画の重複なし姓名を1回ずつ計算する（姓・名の画数列もそれぞれ1回だけ引く）。
+    compact なら結果は GridResult（内訳は読んだときに作る）
+    """
+    make = compact_from_strokes if compact else result_from_strokes
+    fstrokes = {f: tuple(stroke_for_char(c, table) for c in f) for f in plan.surnames}
+    gstrokes = {g: tuple(stroke_for_char(c, table) for c in g) for g in plan.givens}
+    return [make(f, g, fstrokes[f], gstrokes[g]) for f, g in plan.unique]
+
+# ====== 画数列（シグネチャ）ごとの計算 ======
+# 5格は姓・名の文字数と1文字ごとの画数列だけで決まり、字そのものには依らない
+# （田中太郎 と 由中太郎 は画数列が同じなので結果も同じ）。
+# そこで (姓の画数列, 名の画数列) をキーに 5格を1回だけ計算し、同じ画数列の名前で使い回す。
+# キャッシュは辞書に依存しない（画数→5格の対応は固定）ので、辞書や処理をまたいで共有できる。
+Signature = Tuple[Tuple[int, ...], Tuple[int, ...]]
+
+SIGNATURE_CACHE_SIZE = 1_000_000   # これを超えたら空にして作り直す
+
+class SignatureCache:
+    """画数列 → 5格（GRID_KEYS 順のタプル）のキャッシュ。hits / misses を数える"""
+
+    def __init__(self, max_size: int = SIGNATURE_CACHE_SIZE):
+        self.max_size = max_size
+        self.grids: Dict[Signature, Tuple[int, ...]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, sig: Signature) -> Tuple[int, ...]:
+        g = self.grids.get(sig)
+        if g is not None:
+            self.hits += 1
+            return g
+        self.misses += 1
+        if len(self.grids) >= self.max_size:
+            self.grids.clear()
+        g = self.grids[sig] = grids_from_strokes(list(sig[0]), list(sig[1]))
+        return g
+
+    def __len__(self) -> int:
+        return len(self.grids)
+
+# 同じプロセス内の一括計算（キュー作業者・負荷試験など）で共有するキャッシュ
+SHARED_CACHE = SignatureCache()
+
+def score_signatures(
+    plan: BatchPlan,
+    table: Dict[str, int],
+    cache: Optional[SignatureCache] = None,
+    compact: bool = False,
+) -> Tuple[List[Result], int]:
+    """
+    計画の重複なし姓名を画数列に写し、5格は画数列ごとに1回だけ計算する。
+    戻り値は (plan.unique 順の結果, 重複なし画数列の数)
+    """
+    make = compact_from_strokes if compact else result_from_strokes
+    cache = SHARED_CACHE if cache is None else cache
+    fstrokes = {f: tuple(stroke_for_char(c, table) for c in f) for f in plan.surnames}
+    gstrokes = {g: tuple(stroke_for_char(c, table) for c in g) for g in plan.givens}
+    # 1周目: 画数列ごとに5格を決める（キャッシュを引くのは重複なし画数列ごとに1回）
+    sigs = [(fstrokes[f], gstrokes[g]) for f, g in plan.unique]
+    grids = {sig: cache.get(sig) for sig in dict.fromkeys(sigs)}
+    # 2周目: 結果に展開
+    results = [
+        make(f, g, sig[0], sig[1], grids[sig])
+        for (f, g), sig in zip(plan.unique, sigs)
+    ]
+    return results, len(grids)
+
+def score_grids(
+    names: Iterable[Tuple[str, str]],
+    table: Dict[str, int],
+    cache: Optional[SignatureCache] = None,
+) -> List[Tuple[int, ...]]:
+    """
+    内訳のいらない集計向け。入力の行順に 5格のタプル（GRID_KEYS 順）だけを返す。
+    同じ画数列の行は同じタプルを共有する。
+    """
+    plan = plan_batch(names)
+    cache = SHARED_CACHE if cache is None else cache
+    fstrokes = {f: tuple(stroke_for_char(c, table) for c in f) for f in plan.surnames}
+    gstrokes = {g: tuple(stroke_for_char(c, table) for c in g) for g in plan.givens}
+    sigs = [(fstrokes[f], gstrokes[g]) for f, g in plan.unique]
+    grids = {sig: cache.get(sig) for sig in dict.fromkeys(sigs)}
+    unique = [grids[sig] for sig in sigs]
+    return [unique[i] for i in plan.index]
+
+def fan_out(plan: BatchPlan, results: List[Result]) -> List[Result]:
+    """重複なしの結果を入力の行順に戻す（同じ姓名の行は同じ結果オブジェクトを共有する）"""
+    return [results[i] for i in plan.index]
+
+def plan_stats(plan: BatchPlan) -> Dict[str, float]:
+    rows = len(plan.index)
+    unique = len(plan.unique)
+    return {
+        "rows": rows,
+        "unique_names": unique,
+        "unique_surnames": len(plan.surnames),
+        "unique_givens": len(plan.givens),
+        "saved_calcs": rows - unique,
+        "saved_ratio": round(1 - unique / rows, 4) if rows else 0.0,
+    }
+
+def score_batch(
+    names: Iterable[Tuple[str, str]],
+    table: Dict[str, int],
+    by_signature: bool = True,
+    cache: Optional[SignatureCache] = None,
+    compact: bool = False,
+) -> Tuple[List[Result], Dict[str, float]]:
+    """
+    計画 → 重複なし計算 → 行順に展開。戻り値は (入力順の結果, 重複除去の統計)
+    by_signature なら 5格は画数列ごとに1回だけ計算する（cache 省略時は SHARED_CACHE）
+    compact なら結果は dict でなく GridResult（結果を多数保持するときのメモリ削減）
+    """
+    plan = plan_batch(names)
+    stats = plan_stats(plan)
+    if not by_signature:
+        return fan_out(plan, score_plan(plan, table, compact)), stats
+
+    cache = SHARED_CACHE if cache is None else cache
+    hits, misses = cache.hits, cache.misses
+    results, n_sig = score_signatures(plan, table, cache, compact)
+    stats.update({
+        "unique_signatures": n_sig,
+        "signature_ratio": round(n_sig / stats["unique_names"], 4) if stats["unique_names"] else 0.0,
+        "cache_hits": cache.hits - hits,
+        "cache_misses": cache.misses - misses,
+    })
+    return fan_out(plan, results), stats
+
+
+def run(args: argparse.Namespace) -> None:
+    table = load_dict()
+    names = list(read_names(args.names_csv))
+    results, stats = score_batch(names, table, by_signature=not args.no_signature, compact=True)
+
+    with open(args.output, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=["姓", "名"] + list(GRID_KEYS))
+        w.writeheader()
+        for (family, given), res in zip(names, results):
+            w.writerow({"姓": family, "名": given, **{k: res[k] for k in GRID_KEYS}})
+
+    print(f"書き出し: {args.output} / {len(results)}件")
+    if args.stats:
+        for k, v in stats.items():
+            print(f"  {k}: {v}")
+
+def main():
+    ap = argparse.ArgumentParser(description="名前リストを重複をまとめて一括計算し、CSVに書き出す")
+    ap.add_argument("names_csv", help="family, given 列を持つCSV")
+    ap.add_argument("--output", default="results.csv")
+    ap.add_argument("--stats", action="store_true", help="重複除去の統計を表示")
+    ap.add_argument("--no-signature", action="store_true", help="画数列ごとのまとめ計算をしない（姓名ごとに計算）")
+    add_profile_args(ap)
+    args = ap.parse_args()
+    with profiled(args, "seimei_batch"):
+        run(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+import argparse
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from seimei_calc import GRID_FIELDS
+from seimei_fortune import LUCK_POINTS, luck_of
+from seimei_store import ALIASES
+
+# 計算済みの結果をメモリに載せ、格の値の組み合わせで絞り込む。
+# 格の値は小さな整数なので、(格, 値) ごとに「その値を持つ行」のビットマップ（Python の int）を持ち、
+# AND / OR / NOT をビット演算にする。件数は int.bit_count() で数える。
+# 索引づくりは seimei_vector の一括計算結果（行数×7 の配列）から numpy で行う。
+#
+# 使い方例:
+# python seimei_bitmap.py names.csv 天格=5,6,7 人格=16 総格=lucky
+# python seimei_bitmap.py names.csv "地格=10-20" "総格!=凶" --limit 50
+# python seimei_bitmap.py names.csv            # 条件を1行ずつ入力する対話モード
+#
+# 条件の書き方（1つの引数が1条件、条件どうしは AND。「|」で区切ると OR）:
+#   格=値,値,...   いずれかに一致（値・範囲・吉凶は「,」で混ぜてよい）
+#   格=下限-上限   範囲（下限:上限 とも書ける。負の値は -5-3 や -5:3）
+#   格=lucky       大吉・吉の数      格=大吉,半吉    指定した吉凶の数
+#   格!=...        否定
+
+LUCKY = ("大吉", "吉")
+PREVIEW = 20   # 表示する行数の既定
+_RANGE = re.compile(r"(-?\d+)\s*[-:]\s*(-?\d+)")
+
+
+def _runs(sorted_values: np.ndarray) -> np.ndarray:
+    """昇順の配列で、値が変わる位置（先頭を含む）"""
+    return np.concatenate(([0], np.flatnonzero(np.diff(sorted_values)) + 1)) if len(sorted_values) else np.zeros(0, np.intp)
+
+def _column_bitmaps(col: np.ndarray) -> Dict[int, int]:
+    """
+    列の値ごとのビットマップ。行番号を値で並べ替え（1回だけ）、値ごとの行番号から
+    バイト位置とビットを求めて、同じバイトのビットを足し合わせる。
+    """
+    nbytes = (len(col) + 7) // 8
+    order = np.argsort(col, kind="stable")
+    starts = _runs(col[order])
+    ends = list(starts[1:]) + [len(col)]
+    out: Dict[int, int] = {}
+    for a, b in zip(starts.tolist(), ends):
+        rows = order[a:b]          # 昇順（stable）
+        pos = rows >> 3
+        bits = (1 << (rows & 7)).astype(np.uint8)
+        first = _runs(pos)
+        buf = np.zeros(nbytes, dtype=np.uint8)
+        buf[pos[first]] = np.add.reduceat(bits, first)
+        out[int(col[rows[0]])] = int.from_bytes(buf.tobytes(), "little")
+    return out
+
+
+class BitmapIndex:
+    """
+    行ごとの 5格（GRID_KEYS 順。(行数, 7) の配列か、タプルの列）から
+    (格, 値) → ビットマップ の索引を作る。行 i がビット i。
+    各メソッドはビットマップ（int）を返すので、& | と negate で組み合わせる。
+    """
+
+    def __init__(
+        self,
+        names: Sequence[Tuple[str, str]],
+        grids,
+        fields: Iterable[str] = GRID_FIELDS,
+    ):
+        self.names = names
+        self.grids = np.asarray(grids, dtype=np.int32).reshape(-1, len(GRID_FIELDS))
+        self.n = len(self.grids)
+        self.mask = (1 << self.n) - 1
+        self.bitmaps: Dict[str, Dict[int, int]] = {}
+        for field in fields:
+            self.bitmaps[field] = _column_bitmaps(self.grids[:, GRID_FIELDS.index(field)])
+
+    def _field(self, name: str) -> str:
+        field = ALIASES.get(name.strip())
+        if field is None or field not in self.bitmaps:
+            raise ValueError(f"未知の格: {name}")
+        return field
+
+    # ====== 条件 → ビットマップ ======
+    def eq(self, field: str, value: int) -> int:
+        return self.bitmaps[self._field(field)].get(value, 0)
+
+    def isin(self, field: str, values: Iterable[int]) -> int:
+        bms = self.bitmaps[self._field(field)]
+        out = 0
+        for v in set(values):
+            out |= bms.get(v, 0)
+        return out
+
+    def between(self, field: str, lo: int, hi: int) -> int:
+        bms = self.bitmaps[self._field(field)]
+        return self.isin(field, [v for v in bms if lo <= v <= hi])
+
+    def luck(self, field: str, levels: Iterable[str] = LUCKY) -> int:
+        """吉凶が levels のいずれかになる値の行（81 を超える数は seimei_fortune の規則で戻す）"""
+        levels = set(levels)
+        bms = self.bitmaps[self._field(field)]
+        return self.isin(field, [v for v in bms if luck_of(v) in levels])
+
+    def negate(self, bm: int) -> int:
+        return ~bm & self.mask
+
+    # ====== 結果 ======
+    @staticmethod
+    def count(bm: int) -> int:
+        return bm.bit_count()
+
+    def rows(self, bm: int, limit: Optional[int] = None) -> List[int]:
+        """ビットの立っている行番号（昇順）。0 のバイトは読み飛ばす"""
+        out: List[int] = []
+        data = bm.to_bytes((self.n + 7) // 8, "little")
+        for k, byte in enumerate(data):
+            while byte:
+                low = byte & -byte
+                out.append((k << 3) + low.bit_length() - 1)
+                if limit is not None and len(out) >= limit:
+                    return out
+                byte ^= low
+        return out
+
+    def select(self, bm: int, limit: Optional[int] = None) -> List[Tuple[str, str, List[int]]]:
+        return [(*self.names[i], self.grids[i].tolist()) for i in self.rows(bm, limit)]
+
+    # ====== 条件式 ======
+    def clause(self, expr: str) -> int:
+        """「格=値」1つ分（書き方はモジュール先頭のコメント参照）"""
+        neg = "!=" in expr
+        name, sep, value = expr.partition("!=" if neg else "=")
+        value = value.strip()
+        if not sep or not value:
+            raise ValueError(f"条件の形式が不正です: {expr}（例: 総格=24）")
+        values: List[int] = []
+        levels: List[str] = []
+        bm = 0
+        for v in (v.strip() for v in value.split(",")):
+            m = _RANGE.fullmatch(v)
+            if v == "lucky":
+                levels.extend(LUCKY)
+            elif v in LUCK_POINTS:
+                levels.append(v)
+            elif m:
+                bm |= self.between(name, int(m.group(1)), int(m.group(2)))
+            else:
+                values.append(int(v))
+        if values:
+            bm |= self.isin(name, values)
+        if levels:
+            bm |= self.luck(name, levels)
+        return self.negate(bm) if neg else bm
+
+    def where(self, exprs: Iterable[str]) -> int:
+        """条件の列を AND でまとめる。1つの条件の中の「|」は OR"""
+        bm = self.mask
+        for e in exprs:
+            part = 0
+            for alt in e.split("|"):
+                part |= self.clause(alt)
+            bm &= part
+        return bm
+
+
+def build_index(
+    names: Sequence[Tuple[str, str]],
+    table: Dict[str, int],
+    fields: Iterable[str] = GRID_FIELDS,
+) -> BitmapIndex:
+    """名前の列を一括計算（内訳なし）して索引にする"""
+    from seimei_vector import score_grids
+    return BitmapIndex(names, score_grids(names, table), fields)
+
+
+def _show(idx: BitmapIndex, exprs: List[str], limit: int) -> None:
+    t0 = time.perf_counter()
+    bm = idx.where(exprs)
+    n = idx.count(bm)
+    ms = (time.perf_counter() - t0) * 1000
+    print(f"{n}件 / {idx.n}件中 ({ms:.2f} ms)")
+    for family, given, g in idx.select(bm, limit):
+        print(f"  {family} {given}  " + " ".join(f"{c}={v}" for c, v in zip(GRID_FIELDS, g)))
+
+def main():
+    from seimei_batch import read_names
+    from seimei_calc import load_dict
+
+    ap = argparse.ArgumentParser(description="計算結果をメモリ上のビットマップ索引で絞り込む")
+    ap.add_argument("names_csv", help="family, given 列を持つCSV")
+    ap.add_argument("conditions", nargs="*", help="例: 天格=5,6,7 人格=16 総格=lucky（省略時は対話モード）")
+    ap.add_argument("--limit", type=int, default=PREVIEW, help="表示する行数")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    names = list(read_names(args.names_csv))
+    idx = build_index(names, load_dict())
+    print(f"索引: {idx.n}件 ({time.perf_counter() - t0:.2f} 秒)")
+
+    if args.conditions:
+        _show(idx, args.conditions, args.limit)
+        return
+    while True:
+        line = input("\n条件（例: 天格=5,6,7 人格=16 総格=lucky／終了=空Enter）: ").strip()
+        if not line:
+            break
+        try:
+            _show(idx, line.split(), args.limit)
+        except ValueError as e:
+            print(e)
+
+if __name__ == "__main__":
+    main()
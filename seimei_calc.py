@@ -1,25 +1,42 @@
 # -*- coding: utf-8 -*-
 import csv
+import hashlib
 import os
 import unicodedata
-from typing import Dict, List, Tuple
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
 
 # ====== 設定 ======
 DICT_FILE = "kanji_master_joyo.csv"     # 常にこの辞書を使用
 OVERRIDES_FILE = "kanji_overrides.csv"  # 存在すれば優先適用
+VARIANTS_FILE = "kanji_variants.csv"    # 異体字（旧字体など）→ 新字体 の表（seimei_variants.py で生成、存在すれば適用）
+DERIVED_FILE = "kanji_derived_strokes.csv"  # 辞書にない字の画数（seimei_ids.py で部品から生成、存在すれば最後に引く）
+OLD_STROKES_FILE = "kanji_old_strokes.csv"  # 旧字体の画数（to_old で写した字を引く。この表にある字を旧字体とみなす）
 
 REPEAT_MARK = "々"
 VARIANT_MAP = {
-    # 必要に応じて異体字→正字体に正規化
-    "禎": "祓",
-    "琢": "琢",
-    "穀": "穀",
-    "祝": "祝",
+    # kanji_variants.csv に加えて（優先して）適用する 異体字→辞書の字。
+    # NFKC の後に引くので、互換漢字（U+F900〜）のうち NFKC で変わる字は書いても効かない
+    "髙": "高",
+    "﨑": "崎",   # U+FA11（互換漢字だが NFKC では変わらない）
+    "邊": "辺",
+    "邉": "辺",
 }
 
+# 異体字の写像の向き
+#   to_old: 新字体 → 旧字体（既定）。旧字体の画数（kanji_old_strokes.csv）で数える。
+#           旧字体が1つに決まる字だけ写し、旧字体でない異体字（髙・﨑・嶋 など）は新字体に寄せてから写す
+#   to_new: 異体字（旧字体）→ 新字体。新字体の画数で数える
+#   none:   写像しない（NFKC と 々 の処理だけ）
+# 異体字の表にある字は to_old / to_new では写されるので、部品からの推定（kanji_derived_strokes.csv）が
+# 効くのは 表にない字か none のときだけ（髙 の推定値は none のときだけ使われる）。
+VARIANT_DIRECTIONS = ("to_new", "to_old", "none")
+VARIANT_DIRECTION = "to_old"
+
 # ====== ローダ ======
-def _load_overrides() -> Dict[str, int]:
-    path = os.path.join(os.path.dirname(__file__), OVERRIDES_FILE)
+def _load_char_strokes(name: str) -> Dict[str, int]:
+    """char, strokes 列のCSV（なければ空）"""
+    path = os.path.join(os.path.dirname(__file__), name)
     data = {}
     try:
         with open(path, "r", encoding="utf-8-sig", newline="") as f:
@@ -36,9 +53,9 @@ def _load_overrides() -> Dict[str, int]:
         pass
     return data
 
-def load_dict() -> Dict[str, int]:
-    """kanji_master_joyo.csv を固定で読み込む"""
-    path = os.path.join(os.path.dirname(__file__), DICT_FILE)
+def load_dict(csv_path: Optional[str] = None) -> Dict[str, int]:
+    """kanji_master_joyo.csv を固定で読み込む（csv_path を渡せば別のマスタCSV）"""
+    path = csv_path or os.path.join(os.path.dirname(__file__), DICT_FILE)
     d = {}
     with open(path, "r", encoding="utf-8-sig", newline="") as f:
         rdr = csv.DictReader(f)
@@ -47,7 +64,7 @@ def load_dict() -> Dict[str, int]:
         # 優先: strokes_old / strokes / count の順で探索
         header = [c.strip().lower() for c in rdr.fieldnames or []]
         if "kanji" not in header:
-            raise RuntimeError("CSVに 'kanji' 列が見つかりません: " + DICT_FILE)
+            raise RuntimeError("CSVに 'kanji' 列が見つかりません: " + (csv_path or DICT_FILE))
 
         def pick(row, *cands):
             for c in cands:
@@ -67,15 +84,122 @@ def load_dict() -> Dict[str, int]:
                 d[k] = 0
     return d
 
-_KANJI_OVERRIDES = _load_overrides()
+_KANJI_OVERRIDES = _load_char_strokes(OVERRIDES_FILE)
+_KANJI_OLD = _load_char_strokes(OLD_STROKES_FILE)    # 辞書・上書きのどちらにもない字に使う（旧字体）
+_KANJI_DERIVED = _load_char_strokes(DERIVED_FILE)   # 上のどれにもない字だけに使う
+
+def load_variants(path: Optional[str] = None) -> Dict[str, str]:
+    """
+    kanji_variants.csv（variant, target 列）と VARIANT_MAP を合わせた 異体字→新字体。
+    写像先がさらに写像される場合は最後までたどる（2回適用しても変わらないように）。
+    """
+    path = path or os.path.join(os.path.dirname(__file__), VARIANTS_FILE)
+    m: Dict[str, str] = {}
+    try:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                src = (row.get("variant") or "").strip()
+                dst = (row.get("target") or "").strip()
+                if src and dst:
+                    m[src] = dst
+    except FileNotFoundError:
+        pass
+    m.update(VARIANT_MAP)
+
+    out: Dict[str, str] = {}
+    for src in m:
+        dst, seen = m[src], {src}
+        while dst in m and dst not in seen:
+            seen.add(dst)
+            dst = m[dst]
+        if dst != src:
+            out[src] = dst
+    return out
+
+def variant_table(
+    variants: Dict[str, str],
+    direction: str = "to_old",
+    old_forms: Optional[Iterable[str]] = None,
+) -> Dict[int, str]:
+    """
+    str.translate 用の表。
+    to_old は 新字体 → 旧字体（old_forms にある異体字。既定は kanji_old_strokes.csv の字）で、
+    旧字体が1つに決まる新字体だけを写す。旧字体でない異体字は 新字体（さらに旧字体があればそれ）へ写す。
+    """
+    if direction not in VARIANT_DIRECTIONS:
+        raise ValueError(f"未知の向き: {direction}（{', '.join(VARIANT_DIRECTIONS)}）")
+    if direction == "none":
+        return {}
+    if direction == "to_new":
+        return {ord(src): dst for src, dst in variants.items() if len(src) == 1}
+    old = set(_KANJI_OLD if old_forms is None else old_forms)
+    olds: Dict[str, List[str]] = {}
+    for src, dst in variants.items():
+        if src in old:
+            olds.setdefault(dst, []).append(src)
+    to_old = {new: srcs[0] for new, srcs in olds.items() if len(srcs) == 1}
+    out = {ord(new): o for new, o in to_old.items() if len(new) == 1}
+    for src, dst in variants.items():
+        if len(src) == 1 and src not in old:
+            out[ord(src)] = to_old.get(dst, dst)
+    return out
+
+_VARIANTS = load_variants()
+_VARIANT_TABLE = variant_table(_VARIANTS, VARIANT_DIRECTION)
+
+def set_variant_direction(direction: str) -> None:
+    """normalize_name が使う異体字の向きを切り替える"""
+    global VARIANT_DIRECTION, _VARIANT_TABLE
+    _VARIANT_TABLE = variant_table(_VARIANTS, direction)
+    VARIANT_DIRECTION = direction
+
+def dictionary_snapshot(table: Dict[str, int], derived: bool = True, old_forms: bool = True) -> Dict[str, int]:
+    """
+    実際に使われる 文字→画数（部品からの推定・旧字体の画数の上に 辞書・kanji_overrides.csv を重ねたもの）。
+    stroke_for_char と同じく、辞書の 0（画数が読めなかった行）は下の層を隠さない
+    """
+    snap = dict(_KANJI_DERIVED) if derived else {}
+    if old_forms:
+        snap.update(_KANJI_OLD)
+    snap.update((k, v) for k, v in table.items() if v or k not in snap)
+    snap.update(_KANJI_OVERRIDES)
+    return snap
+
+def dictionary_version(table: Dict[str, int]) -> str:
+    """
+    辞書（+ kanji_overrides.csv + 旧字体の画数 + 部品からの推定）と、normalize_name が使う異体字の表・向きの内容ハッシュ。
+    結果がどの辞書で計算されたかの識別に使う（異体字の表や向きを変えても版が変わる）
+    """
+    h = hashlib.sha1()
+    for k in sorted(table):
+        h.update(f"{k}\t{table[k]}\n".encode("utf-8"))
+    h.update(b"#overrides\n")
+    for k in sorted(_KANJI_OVERRIDES):
+        h.update(f"{k}\t{_KANJI_OVERRIDES[k]}\n".encode("utf-8"))
+    for name, layer in (("old", _KANJI_OLD), ("derived", _KANJI_DERIVED)):
+        if layer:
+            h.update(f"#{name}\n".encode("utf-8"))
+            for k in sorted(layer):
+                h.update(f"{k}\t{layer[k]}\n".encode("utf-8"))
+    h.update(f"#variants\t{variant_version()}\n".encode("utf-8"))
+    return h.hexdigest()[:12]
+
+def variant_version() -> str:
+    """normalize_name が使う異体字の向きと表の内容ハッシュ（保存した姓名の正規化が今と同じかの判定に使う）"""
+    h = hashlib.sha1(f"{VARIANT_DIRECTION}\n".encode("utf-8"))
+    for k in sorted(_VARIANT_TABLE):
+        h.update(f"{chr(k)}\t{_VARIANT_TABLE[k]}\n".encode("utf-8"))
+    return h.hexdigest()[:12]
 
 
 # ====== 正規化 & 画数 ======
 def normalize_name(s: str) -> str:
-    s = unicodedata.normalize("NFKC", s or "")
+    # NFKC → 異体字の表（str.translate で一度に置換）→ 々 を直前の字に
+    s = unicodedata.normalize("NFKC", s or "").translate(_VARIANT_TABLE)
+    if REPEAT_MARK not in s:
+        return s
     out: List[str] = []
     for ch in s:
-        ch = VARIANT_MAP.get(ch, ch)
         if ch == REPEAT_MARK and out:
             ch = out[-1]
         out.append(ch)
@@ -84,7 +208,11 @@ def normalize_name(s: str) -> str:
 def stroke_for_char(ch: str, table: Dict[str, int]) -> int:
     if ch in _KANJI_OVERRIDES:
         return _KANJI_OVERRIDES[ch]
-    return table.get(ch, 0)
+    v = table.get(ch)
+    if v:
+        return v
+    # 辞書にない字・画数が読めなかった字（load_dict は 0 にする）は 旧字体の画数 → 部品からの推定 の順に引く
+    return _KANJI_OLD.get(ch) or _KANJI_DERIVED.get(ch, 0)
 
 def strokes_of(name: str, table: Dict[str, int]) -> int:
     total = 0
@@ -93,12 +221,159 @@ def strokes_of(name: str, table: Dict[str, int]) -> int:
     return total
 
 
-# ====== サイド計算のユーティリティ ======
-def _sum_first(chars: List[str], n: int, table: Dict[str, int]) -> int:
-    return sum(stroke_for_char(c, table) for c in chars[:n])
+# 5格の並び（grids_from_strokes の戻り値の順）
+GRID_KEYS = (
+    "トップ（天格）",
+    "ハート（人格）",
+    "フット（地格）",
+    "サイド",
+    "サイド（表面）",
+    "サイド（本質）",
+    "オール（総格）",
+)
+# GRID_KEYS と同じ順の英字列名（SQLite・Arrow など列名に使う）
+GRID_FIELDS = ("top", "heart", "foot", "side", "side_surface", "side_essence", "allv")
+
+
+# ====== 5格のルール（文字数の区分ごと） ======
+# 各格は「姓の画数列の一部の和 + 名の画数列の一部の和 + 霊数などの定数」で表せる。
+# どの位置を足すかは姓・名の文字数の区分（0, 1, 2, 3以上）だけで決まるので、
+# 区分 (姓, 名) ごとにルールを1つの表にまとめ、実際の文字数ごとに位置の列へ展開（コンパイル）して使う。
+# ルールの中身は calc の docstring を参照。
+class Term(NamedTuple):
+    fam: Optional[slice]   # 姓の画数列のうち足す範囲（None なら足さない）
+    giv: Optional[slice]   # 名の画数列のうち足す範囲
+    const: int = 0         # 霊数など
+
+ALL = slice(None)
+FIRST1 = slice(0, 1)
+FIRST2 = slice(0, 2)
+LAST1 = slice(-1, None)
+LAST2 = slice(-2, None)
+
+def length_bucket(n: int) -> int:
+    """文字数の区分（3以上は 3）"""
+    return n if n < 3 else 3
+
+# サイドの (表面, 本質)。キーは (姓の区分, 名の区分)
+# - 姓・名ともに3文字以上 → 姓頭2 + 名末2（表面=本質）
+# - 姓が3文字以上 → 姓頭2 + 名末1（表面=本質）。名1文字ならケツ霊数も乗る
+# - それ以外 → 頭（姓1文字なら霊数1、姓2文字なら姓頭1）+ 名末1、名3文字以上の表面は名末2
+SIDE_RULES: Dict[Tuple[int, int], Tuple[Term, Term]] = {
+    (0, 0): (Term(None, None), Term(None, None)),
+    (0, 1): (Term(None, LAST1, 1), Term(None, LAST1, 1)),
+    (0, 2): (Term(None, LAST1), Term(None, LAST1)),
+    (0, 3): (Term(None, LAST2), Term(None, LAST1)),
+    (1, 0): (Term(None, None, 1), Term(None, None, 1)),
+    (1, 1): (Term(None, LAST1, 2), Term(None, LAST1, 2)),
+    (1, 2): (Term(None, LAST1, 1), Term(None, LAST1, 1)),
+    (1, 3): (Term(None, LAST2, 1), Term(None, LAST1, 1)),
+    (2, 0): (Term(FIRST1, None), Term(FIRST1, None)),
+    (2, 1): (Term(FIRST1, LAST1, 1), Term(FIRST1, LAST1, 1)),
+    (2, 2): (Term(FIRST1, LAST1), Term(FIRST1, LAST1)),
+    (2, 3): (Term(FIRST1, LAST2), Term(FIRST1, LAST1)),
+    (3, 0): (Term(FIRST1, None), Term(FIRST1, None)),
+    (3, 1): (Term(FIRST2, LAST1, 1), Term(FIRST2, LAST1, 1)),
+    (3, 2): (Term(FIRST2, LAST1), Term(FIRST2, LAST1)),
+    (3, 3): (Term(FIRST2, LAST2), Term(FIRST2, LAST2)),
+}
 
-def _sum_last(chars: List[str], n: int, table: Dict[str, int]) -> int:
-    return sum(stroke_for_char(c, table) for c in chars[-n:]) if n > 0 else 0
+def bucket_rules(fb: int, gb: int) -> Tuple[Term, ...]:
+    """区分 (姓, 名) の 5格のルール（GRID_KEYS 順）"""
+    rei_head = 1 if fb == 1 else 0
+    rei_tail = 1 if gb == 1 else 0
+    surface, essence = SIDE_RULES[(fb, gb)]
+    return (
+        Term(ALL, None, rei_head),                                    # トップ: 姓の和 + 頭の霊数
+        Term(LAST1, FIRST1) if fb and gb else Term(None, None),       # ハート: 姓末 + 名頭
+        Term(None, ALL, rei_tail),                                    # フット: 名の和 + ケツの霊数
+        essence,                                                      # サイド（= 本質、0 未満にしない）
+        surface,
+        essence,
+        Term(ALL, ALL),                                               # オール: 霊数を含めない（60 超は 1 から）
+    )
+
+GRID_RULES: Dict[Tuple[int, int], Tuple[Term, ...]] = {
+    (fb, gb): bucket_rules(fb, gb) for fb in range(4) for gb in range(4)
+}
+
+
+# ====== 評価計画 ======
+class GridPlan(NamedTuple):
+    """
+    文字数 (fn, gn) ごとにコンパイルしたルール。
+    画数列は 姓 + 名 を連結したもの（名の位置は fn ずらす）として、
+    各格が足す位置の列と定数を GRID_KEYS 順に持つ。
+    evaluate は連結した画数列を受け取り、サイドの下限・総画の数え直しまで済ませた
+    5格のタプルを返す（位置と定数を閉じ込めた関数）。
+    """
+    fn: int
+    gn: int
+    positions: Tuple[Tuple[int, ...], ...]
+    consts: Tuple[int, ...]
+    evaluate: Callable[[Sequence[int]], Tuple[int, ...]]
+
+_PLANS: Dict[Tuple[int, int], GridPlan] = {}
+
+def _plan_term(pos: Tuple[int, ...], const: int) -> Callable[[Sequence[int]], int]:
+    """位置 pos の画数の和 + const を返す関数"""
+    if not pos:
+        return lambda s: const
+    if len(pos) == 1:
+        i, = pos
+        return lambda s: s[i] + const
+    if len(pos) == 2:
+        i, j = pos
+        return lambda s: s[i] + s[j] + const
+    get = itemgetter(*pos)
+    return lambda s: sum(get(s), const)
+
+def _plan_evaluator(
+    positions: Tuple[Tuple[int, ...], ...],
+    consts: Tuple[int, ...],
+) -> Callable[[Sequence[int]], Tuple[int, ...]]:
+    """格ごとの和の関数をまとめる（サイドは 0 未満にせず、総画は数え直す）"""
+    top, heart, foot, side, surface, essence, allv = (_plan_term(p, c) for p, c in zip(positions, consts))
+
+    def evaluate(s: Sequence[int]) -> Tuple[int, ...]:
+        return (top(s), heart(s), foot(s), max(side(s), 0), surface(s), essence(s), wrap_total(allv(s)))
+
+    return evaluate
+
+def compile_plan(fn: int, gn: int) -> GridPlan:
+    fam = range(fn)
+    giv = range(fn, fn + gn)
+    positions: List[Tuple[int, ...]] = []
+    consts: List[int] = []
+    for t in GRID_RULES[(length_bucket(fn), length_bucket(gn))]:
+        pos = list(fam[t.fam]) if t.fam is not None else []
+        if t.giv is not None:
+            pos += list(giv[t.giv])
+        positions.append(tuple(pos))
+        consts.append(t.const)
+
+    return GridPlan(fn, gn, tuple(positions), tuple(consts), _plan_evaluator(tuple(positions), tuple(consts)))
+
+def plan_for(fn: int, gn: int) -> GridPlan:
+    """文字数 (fn, gn) の評価計画（初回にコンパイルしてキャッシュ）"""
+    plan = _PLANS.get((fn, gn))
+    if plan is None:
+        plan = _PLANS[(fn, gn)] = compile_plan(fn, gn)
+    return plan
+
+def wrap_total(v: int) -> int:
+    """総画の 60 超過は 1 から数え直す（61→1）"""
+    return ((v - 1) % 60) + 1 if v > 60 else v
+
+def grids_from_strokes(
+    fs: Sequence[int],
+    gs: Sequence[int],
+) -> Tuple[int, int, int, int, int, int, int]:
+    """
+    姓・名の1文字ごとの画数列から 5格を算出する（ルールは calc / GRID_RULES を参照）。
+    戻り値は GRID_KEYS の順のタプル。
+    """
+    return plan_for(len(fs), len(gs)).evaluate([*fs, *gs])
 
 
 def calc(
@@ -123,93 +398,116 @@ def calc(
 
     f = normalize_name(family)
     g = normalize_name(given)
-    fchars = list(f)
-    gchars = list(g)
-    fn, gn = len(fchars), len(gchars)
-
-    # 霊数の付与
-    rei_head = 1 if fn == 1 else 0
-    rei_tail = 1 if gn == 1 else 0
-
-    # トップ（天格）
-    top = strokes_of(f, table) + rei_head
-
-    # ハート（人格）
-    heart = 0
-    if fn > 0 and gn > 0:
-        heart = stroke_for_char(fchars[-1], table) + stroke_for_char(gchars[0], table)
-
-    # フット（地格）
-    foot = strokes_of(g, table) + rei_tail
-
-    # サイド（外格）: 表面/本質の両方を可能なら計算
-    side_surface = None
-    side_essence = None
-
-    # 例外：姓・名ともに3文字以上 → サイド=姓頭2+名末2（表面=本質）
-    if fn >= 3 and gn >= 3:
-        v = _sum_first(fchars, 2, table) + _sum_last(gchars, 2, table)
-        side_essence = side_surface = v
-
-    # 姓が3文字以上 → サイド=姓頭2+名末1（表面=本質）
-    elif fn >= 3 and gn >= 1:
-        v = _sum_first(fchars, 2, table) + _sum_last(gchars, 1, table)
-        # 名1文字ならケツ霊数も乗る
-        if gn == 1:
-            v += rei_tail
-        side_essence = side_surface = v
-
-    else:
-        # それ以外の基本（名が3文字以上なら 表面/本質）
-        # 表面: 姓1 + 名末2／本質: 姓1 + 名末1
-        # 姓1文字の場合は頭は霊数1
-        head_1 = rei_head if fn == 1 else (_sum_first(fchars, 1, table) if fn >= 1 else 0)
-
-        if gn >= 3:
-            tail_1 = _sum_last(gchars, 1, table)
-            tail_2 = _sum_last(gchars, 2, table)
-            # 名1文字のケースはここに来ないが、念のため
-            side_essence = head_1 + tail_1
-            side_surface = head_1 + tail_2
-
-        elif gn == 2:
-            tail_1 = _sum_last(gchars, 1, table)
-            side_essence = head_1 + tail_1
-            side_surface = side_essence  # 表面は定義なし→同値扱い
-
-        elif gn == 1:
-            tail_1 = _sum_last(gchars, 1, table)
-            side_essence = head_1 + tail_1 + rei_tail  # ケツ霊数も乗る
-            side_surface = side_essence
-
-        else:
-            side_essence = head_1
-            side_surface = head_1
-
-    # 総画（オール）は霊数を含めない
-    allv_raw = strokes_of(f, table) + strokes_of(g, table)
-    # 60 超過なら 1 から数え直し（61→1）
-    allv = ((allv_raw - 1) % 60) + 1 if allv_raw > 60 else allv_raw
-
-    # 文字内訳（霊数は別途表記）
+    fs = [stroke_for_char(c, table) for c in f]
+    gs = [stroke_for_char(c, table) for c in g]
+    return result_from_strokes(f, g, fs, gs)
+
+def make_breakdown(
+    f: str,
+    g: str,
+    fs: Sequence[int],
+    gs: Sequence[int],
+) -> List[Tuple[str, int, str]]:
+    """文字内訳（霊数は別途表記し、集計には含めない）"""
     breakdown: List[Tuple[str, int, str]] = []
-    for ch in fchars:
-        breakdown.append(("姓", stroke_for_char(ch, table), ch))
-    for ch in gchars:
-        breakdown.append(("名", stroke_for_char(ch, table), ch))
+    for ch, v in zip(f, fs):
+        breakdown.append(("姓", v, ch))
+    for ch, v in zip(g, gs):
+        breakdown.append(("名", v, ch))
     # 霊数の見える化（集計に含めない）
-    if rei_head:
+    if len(fs) == 1:
         breakdown.append(("霊", 1, "頭"))
-    if rei_tail:
+    if len(gs) == 1:
         breakdown.append(("霊", 1, "末"))
+    return breakdown
+
+def result_from_strokes(
+    f: str,
+    g: str,
+    fs: Sequence[int],
+    gs: Sequence[int],
+    grids: Optional[Tuple[int, ...]] = None,
+) -> Dict[str, int | str | List[Tuple[str, int, str]]]:
+    """
+    正規化済みの姓・名とその画数列から calc と同じ形の結果を作る。
+    grids を渡せば（同じ画数列で計算済みの値として）そのまま使う。
+    """
+    if grids is None:
+        grids = grids_from_strokes(fs, gs)
+    res: Dict[str, int | str | List[Tuple[str, int, str]]] = dict(zip(GRID_KEYS, grids))
+    res["内訳"] = make_breakdown(f, g, fs, gs)
+    return res
+
 
-    return {
-        "トップ（天格）": top,
-        "ハート（人格）": heart,
-        "フット（地格）": foot,
-        "サイド": max(side_essence, 0),
-        "サイド（表面）": side_surface,
-        "サイド（本質）": side_essence,
-        "オール（総格）": allv,
-        "内訳": breakdown,
-    }
+# ====== コンパクトな結果 ======
+_GRID_INDEX = {k: i for i, k in enumerate(GRID_KEYS, start=4)}
+
+class GridResult(NamedTuple):
+    """
+    calc の結果のコンパクト版（dict の代わりに、格ごとの整数を持つタプル）。
+    内訳は持たず、breakdown / ["内訳"] を読んだときに姓・名と画数列から作る。
+    res["トップ（天格）"] / res.get("トップ（天格）") のように GRID_KEYS の文字列でも引けるので、
+    calc の結果を [] と get で読むコードはそのまま使える（in や for はタプルとしての動きなので、
+    dict として扱いたいときは to_dict()）。格の欄は GRID_FIELDS と同じ名前・順。
+    """
+    family: str                 # 正規化済みの姓
+    given: str                  # 正規化済みの名
+    fs: Tuple[int, ...]         # 姓の1文字ごとの画数
+    gs: Tuple[int, ...]         # 名の1文字ごとの画数
+    top: int
+    heart: int
+    foot: int
+    side: int
+    side_surface: int
+    side_essence: int
+    allv: int
+
+    @property
+    def grids(self) -> Tuple[int, ...]:
+        return tuple.__getitem__(self, slice(4, None))
+
+    @property
+    def breakdown(self) -> List[Tuple[str, int, str]]:
+        return make_breakdown(self.family, self.given, self.fs, self.gs)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key == "内訳":
+                return self.breakdown
+            return tuple.__getitem__(self, _GRID_INDEX[key])
+        return tuple.__getitem__(self, key)
+
+    def get(self, key: str, default=None):
+        """dict.get と同じ（GRID_KEYS の文字列と "内訳"。それ以外は default）"""
+        if key == "内訳" or key in _GRID_INDEX:
+            return self[key]
+        return default
+
+    def to_dict(self) -> Dict[str, int | str | List[Tuple[str, int, str]]]:
+        """calc と同じ形の dict（内訳つき）"""
+        res: Dict[str, int | str | List[Tuple[str, int, str]]] = dict(zip(GRID_KEYS, self.grids))
+        res["内訳"] = self.breakdown
+        return res
+
+def compact_from_strokes(
+    f: str,
+    g: str,
+    fs: Sequence[int],
+    gs: Sequence[int],
+    grids: Optional[Tuple[int, ...]] = None,
+) -> GridResult:
+    """result_from_strokes のコンパクト版"""
+    fs, gs = tuple(fs), tuple(gs)
+    if grids is None:
+        grids = grids_from_strokes(fs, gs)
+    return GridResult(f, g, fs, gs, *grids)
+
+def calc_compact(family: str, given: str, table: Dict[str, int]) -> GridResult:
+    """calc と同じ計算で、結果を GridResult で返す"""
+    f = normalize_name(family)
+    g = normalize_name(given)
+    return compact_from_strokes(
+        f, g,
+        [stroke_for_char(c, table) for c in f],
+        [stroke_for_char(c, table) for c in g],
+    )
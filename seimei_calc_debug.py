@@ -1,23 +1,13 @@
-import argparse, csv, unicodedata
+import argparse, csv
 
-VARIANT_MAP = {"髙":"高","﨑":"崎","邊":"辺","邉":"辺"}
-REPEAT_MARK = "々"
+from seimei_calc import normalize_name  # 異体字・々 の正規化は seimei_calc と共通
+from seimei_profiling import add_profile_args, profiled
 
 def z2h_digits(s: str) -> str:
     trans = {ord(c): ord('0')+i for i, c in enumerate('０１２３４５６７８９')}
     s = s.translate(trans)
     return "".join(ch for ch in s if ch.isdigit() or ch in "+-")
 
-def normalize_name(s: str) -> str:
-    s = unicodedata.normalize("NFKC", s)
-    out = []
-    for ch in s:
-        ch = VARIANT_MAP.get(ch, ch)
-        if ch == REPEAT_MARK and out:
-            ch = out[-1]
-        out.append(ch)
-    return "".join(out)
-
 def load_table(path: str) -> dict:
     table = {}
     with open(path, "r", encoding="utf-8-sig", newline="") as f:
@@ -44,17 +34,30 @@ def load_table(path: str) -> dict:
 def sum_strokes(s: str, tbl: dict) -> int:
     return sum(tbl.get(ch, 0) for ch in s)
 
+def calc(family: str, given: str, tbl: dict):
+    fam = normalize_name(family)
+    giv = normalize_name(given)
+    top = sum_strokes(fam, tbl)
+    foot = sum_strokes(giv, tbl)
+    heart = (tbl.get(fam[-1],0) + tbl.get(giv[0],0)) if (fam and giv) else top+foot
+    allv = top + foot
+    side = max(allv - heart, 0)
+    return fam,giv,top,heart,foot,side,allv
+
 def main():
     ap = argparse.ArgumentParser(description="5格計算（デバッグ表示つき）")
     ap.add_argument("csv", help="kanji_master_custom.csv")
     ap.add_argument("--family", "-f", required=True)
     ap.add_argument("--given", "-g", required=True)
     ap.add_argument("--verbose", "-v", action="store_true", help="各文字の画数を表示")
+    add_profile_args(ap)
     args = ap.parse_args()
+    with profiled(args, "seimei_calc_debug"):
+        run(args)
 
+def run(args):
     tbl = load_table(args.csv)
-    fam = normalize_name(args.family)
-    giv = normalize_name(args.given)
+    fam,giv,top,heart,foot,side,allv = calc(args.family, args.given, tbl)
 
     if args.verbose:
         print("---- 文字ごとの画数 ----")
@@ -63,12 +66,6 @@ def main():
         for ch in giv:
             print(f"[名]{ch} = {tbl.get(ch, 0)}")
 
-    top = sum_strokes(fam, tbl)
-    foot = sum_strokes(giv, tbl)
-    heart = (tbl.get(fam[-1],0) + tbl.get(giv[0],0)) if (fam and giv) else top+foot
-    allv = top + foot
-    side = max(allv - heart, 0)
-
     print("\n==== 計算結果 ====")
     print(f"姓：{fam} / 名：{giv}")
     print(f"トップ(天格): {top}")
@@ -1,23 +1,13 @@
 # seimei_cli.py
-import csv, unicodedata, os, sys
+import argparse, csv, os, sys
 
-VARIANT_MAP = {"髙":"高","﨑":"崎","邊":"辺","邉":"辺"}
-REPEAT_MARK = "々"
+from seimei_calc import normalize_name  # 異体字・々 の正規化は seimei_calc と共通
+from seimei_profiling import add_profile_args, profiled
 
 def z2h_digits(s: str) -> str:
     trans = {ord(c): ord('0')+i for i, c in enumerate('０１２３４５６７８９')}
     return s.translate(trans)
 
-def normalize_name(s: str) -> str:
-    s = unicodedata.normalize("NFKC", s)
-    out = []
-    for ch in s:
-        ch = VARIANT_MAP.get(ch, ch)
-        if ch == REPEAT_MARK and out:
-            ch = out[-1]
-        out.append(ch)
-    return "".join(out)
-
 def load_table(csv_path: str) -> dict:
     with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
         r = csv.DictReader(f)
@@ -89,4 +79,8 @@ def main():
         print(f"オール(総格): {allv}")
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser(description="姓名5格 計算ツール (CLI)")
+    add_profile_args(ap)
+    args = ap.parse_args()
+    with profiled(args, "seimei_cli"):
+        main()
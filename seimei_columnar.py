@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+import argparse
+import itertools
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from seimei_calc import GRID_FIELDS, GRID_KEYS
+from seimei_profiling import add_profile_args, profiled
+
+# 一括計算の結果を Arrow / Parquet の列形式で書き出す。
+# 格ごとに int16 の列、内訳は list<struct<kind, strokes, char>> の列にする。
+# pyarrow は任意の依存（pip install pyarrow）。入っていなければ使うときにエラーにする。
+#
+# 使い方例:
+# python seimei_columnar.py names.csv --output results.parquet
+# python seimei_columnar.py names.csv --output results.arrow --no-breakdown
+#
+# 読み戻し:
+# pandas.read_parquet("results.parquet")  /  pyarrow.feather.read_table("results.arrow").to_pandas()
+
+BATCH_ROWS = 65536   # 1レコードバッチあたりの行数
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise RuntimeError("列形式の出力には pyarrow が必要です: pip install pyarrow") from e
+    return pa
+
+def result_schema(breakdown: bool = True):
+    pa = _pyarrow()
+    fields = [pa.field("family", pa.string()), pa.field("given", pa.string())]
+    fields += [pa.field(c, pa.int16()) for c in GRID_FIELDS]
+    if breakdown:
+        fields.append(pa.field("breakdown", pa.list_(pa.struct([
+            pa.field("kind", pa.string()),
+            pa.field("strokes", pa.int16()),
+            pa.field("char", pa.string()),
+        ]))))
+    return pa.schema(fields)
+
+
+class ResultWriter:
+    """
+    (姓, 名, calc結果) を BATCH_ROWS 行ずつレコードバッチにして書き出す。
+    拡張子が .parquet なら Parquet、それ以外は Arrow IPC（Feather v2）。
+    """
+
+    def __init__(self, path: str, breakdown: bool = True, batch_rows: int = BATCH_ROWS):
+        pa = _pyarrow()
+        self.path = path
+        self.breakdown = breakdown
+        self.batch_rows = batch_rows
+        self.schema = result_schema(breakdown)
+        self.rows = 0
+        self._cols: Dict[str, list] = {}
+        self._reset()
+        self._sink = None
+        if path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(path, self.schema)
+        else:
+            self._sink = pa.OSFile(path, "wb")
+            self._writer = pa.ipc.new_file(self._sink, self.schema)
+
+    def _reset(self) -> None:
+        self._cols = {f.name: [] for f in self.schema}
+
+    def write(self, family: str, given: str, res: dict) -> None:
+        cols = self._cols
+        cols["family"].append(family)
+        cols["given"].append(given)
+        for c, k in zip(GRID_FIELDS, GRID_KEYS):
+            cols[c].append(res[k])
+        if self.breakdown:
+            cols["breakdown"].append([
+                {"kind": kind, "strokes": strokes, "char": ch} for kind, strokes, ch in res["内訳"]
+            ])
+        if len(cols["family"]) >= self.batch_rows:
+            self.flush()
+
+    def write_many(self, items: Iterable[Tuple[str, str, dict]]) -> None:
+        for family, given, res in items:
+            self.write(family, given, res)
+
+    def flush(self) -> None:
+        pa = _pyarrow()
+        n = len(self._cols["family"])
+        if not n:
+            return
+        arrays = [pa.array(self._cols[f.name], type=f.type) for f in self.schema]
+        batch = pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+        if self._sink is None:
+            # Parquet は1バッチを1行グループとして書く
+            self._writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            self._writer.write_batch(batch)
+        self.rows += n
+        self._reset()
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def write_results(
+    path: str,
+    items: Iterable[Tuple[str, str, dict]],
+    breakdown: bool = True,
+    batch_rows: Optional[int] = None,
+) -> int:
+    """(姓, 名, calc結果) の列をまとめて書き出し、行数を返す"""
+    with ResultWriter(path, breakdown, batch_rows or BATCH_ROWS) as w:
+        w.write_many(items)
+    return w.rows
+
+
+def score_chunks(
+    names: Iterable[Tuple[str, str]],
+    table: Dict[str, int],
+    chunk_rows: int = BATCH_ROWS,
+) -> Iterator[Tuple[str, str, dict]]:
+    """
+    (姓, 名) の列を chunk_rows 行ずつ一括計算し、(姓, 名, 結果) を入力順に返す。
+    メモリに載るのは1塊分の名前と結果だけ（画数列キャッシュは塊をまたいで共有）。
+    """
+    from seimei_batch import score_batch
+
+    it = iter(names)
+    while True:
+        chunk = list(itertools.islice(it, chunk_rows))
+        if not chunk:
+            return
+        results, _ = score_batch(chunk, table, compact=True)
+        for (family, given), res in zip(chunk, results):
+            yield family, given, res
+
+
+def run(args: argparse.Namespace) -> None:
+    from seimei_batch import read_names
+    from seimei_calc import load_dict
+
+    table = load_dict()
+    n = write_results(
+        args.output,
+        score_chunks(read_names(args.names_csv), table, args.batch_rows),
+        breakdown=not args.no_breakdown,
+        batch_rows=args.batch_rows,
+    )
+    print(f"書き出し: {args.output} / {n}件")
+
+def main():
+    ap = argparse.ArgumentParser(description="名前リストを一括計算し、Parquet / Arrow で書き出す")
+    ap.add_argument("names_csv", help="family, given 列を持つCSV")
+    ap.add_argument("--output", default="results.parquet", help=".parquet または .arrow")
+    ap.add_argument("--no-breakdown", action="store_true", help="内訳の列を出さない")
+    ap.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    add_profile_args(ap)
+    args = ap.parse_args()
+    with profiled(args, "seimei_columnar"):
+        run(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+import argparse
+import csv
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from seimei_calc import calc, load_dict
+
+# ====== 設定 ======
+# 数の下一桁 → 五行（1,2=木 3,4=火 5,6=土 7,8=金 9,0=水）
+ELEMENTS = ("木", "火", "土", "金", "水")
+_NONE = len(ELEMENTS)   # 格が 0（計算対象なし）のとき
+
+# 相性を見る格（人格・総格）
+COMPAT_GRIDS = ("ハート（人格）", "オール（総格）")
+
+# 五行の関係ごとの点数
+RELATION_POINTS = {
+    "相生": 2,
+    "比和": 1,
+    "相剋": 0,
+}
+
+TILE = 1024   # タイル出力時の1辺
+
+
+# ====== 五行 ======
+def element_of(n: int) -> int:
+    """数の五行（ELEMENTS の添字）。0 以下は _NONE"""
+    if n <= 0:
+        return _NONE
+    return ((n - 1) % 10) // 2
+
+def relation(a: int, b: int) -> str:
+    """五行 a と b の関係（相生/比和/相剋）。どちらかが _NONE なら空文字"""
+    if a == _NONE or b == _NONE:
+        return ""
+    if a == b:
+        return "比和"
+    d = (b - a) % 5
+    # 木→火→土→金→水→木 が相生（隣同士）、一つ飛ばしが相剋
+    return "相生" if d in (1, 4) else "相剋"
+
+
+# ====== 事前計算 ======
+def _pair_points() -> List[List[int]]:
+    n = _NONE + 1
+    return [[RELATION_POINTS.get(relation(a, b), 0) for b in range(n)] for a in range(n)]
+
+_PAIR = _pair_points()
+
+def build_score_table(grids: Sequence[str] = COMPAT_GRIDS) -> List[List[int]]:
+    """
+    人ごとの「格ごとの五行」を1つの符号にまとめ、符号×符号 → 点数 の表を作る。
+    行列の各要素はこの表を1回引くだけになる。
+    """
+    n = _NONE + 1
+    size = n ** len(grids)
+    table = [[0] * size for _ in range(size)]
+    for ca in range(size):
+        for cb in range(size):
+            s, a, b = 0, ca, cb
+            for _ in grids:
+                s += _PAIR[a % n][b % n]
+                a //= n
+                b //= n
+            table[ca][cb] = s
+    return table
+
+def encode(res: dict, grids: Sequence[str] = COMPAT_GRIDS) -> int:
+    """calc の結果を五行の符号に変換する"""
+    n = _NONE + 1
+    code = 0
+    for k in reversed(grids):
+        code = code * n + element_of(res.get(k) or 0)
+    return code
+
+def encode_names(
+    names: Sequence[Tuple[str, str]],
+    table: Dict[str, int],
+    grids: Sequence[str] = COMPAT_GRIDS,
+) -> List[int]:
+    """名前リストを calc で1回ずつ採点し、符号の列にする"""
+    return [encode(calc(family, given, table), grids) for family, given in names]
+
+
+# ====== 相性行列 ======
+def compat_row(code_a: int, codes_b: Sequence[int], score_table: List[List[int]]) -> List[int]:
+    row = score_table[code_a]
+    return [row[c] for c in codes_b]
+
+def compat_matrix(
+    codes_a: Sequence[int],
+    codes_b: Sequence[int],
+    score_table: List[List[int]],
+) -> List[List[int]]:
+    """N×M の相性行列（全体をメモリに持つ。大きい場合は iter_tiles を使う）"""
+    return [compat_row(ca, codes_b, score_table) for ca in codes_a]
+
+def iter_tiles(
+    codes_a: Sequence[int],
+    codes_b: Sequence[int],
+    score_table: List[List[int]],
+    tile: int = TILE,
+) -> Iterator[Tuple[int, int, List[List[int]]]]:
+    """
+    相性行列を tile×tile のブロックで順に返す: (行の開始, 列の開始, ブロック)。
+    同時に持つのは1ブロック分だけ。
+    """
+    for i0 in range(0, len(codes_a), tile):
+        rows_a = codes_a[i0:i0 + tile]
+        for j0 in range(0, len(codes_b), tile):
+            cols_b = codes_b[j0:j0 + tile]
+            yield i0, j0, [compat_row(ca, cols_b, score_table) for ca in rows_a]
+
+
+def main():
+    from seimei_batch import read_names
+
+    ap = argparse.ArgumentParser(description="2つの名前リストの相性行列（人格・総格の五行）")
+    ap.add_argument("names_a", help="family, given 列を持つCSV（行側）")
+    ap.add_argument("names_b", help="family, given 列を持つCSV（列側）")
+    ap.add_argument("--output", default="compat.csv")
+    ap.add_argument("--format", choices=["matrix", "long"], default="matrix",
+                    help="matrix=行列CSV（1行ずつ書き出し） / long=a,b,score の縦持ち（タイル単位）")
+    ap.add_argument("--tile", type=int, default=TILE, help="long 形式のタイル1辺")
+    ap.add_argument("--min-score", type=int, default=None, help="long 形式でこの点数未満を出力しない")
+    args = ap.parse_args()
+
+    table = load_dict()
+    names_a = list(read_names(args.names_a))
+    names_b = list(read_names(args.names_b))
+    codes_a = encode_names(names_a, table)
+    codes_b = encode_names(names_b, table)
+    score_table = build_score_table()
+
+    written = 0
+    with open(args.output, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f)
+        if args.format == "matrix":
+            w.writerow([""] + [fam + giv for fam, giv in names_b])
+            for (fam, giv), ca in zip(names_a, codes_a):
+                w.writerow([fam + giv] + compat_row(ca, codes_b, score_table))
+                written += 1
+        else:
+            w.writerow(["a", "b", "score"])
+            for i0, j0, block in iter_tiles(codes_a, codes_b, score_table, args.tile):
+                for di, row in enumerate(block):
+                    a = "".join(names_a[i0 + di])
+                    for dj, s in enumerate(row):
+                        if args.min_score is not None and s < args.min_score:
+                            continue
+                        w.writerow([a, "".join(names_b[j0 + dj]), s])
+                        written += 1
+
+    print(f"書き出し: {args.output} / {len(names_a)}×{len(names_b)} / {written}行")
+
+if __name__ == "__main__":
+    main()
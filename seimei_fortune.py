@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+import argparse
+import csv
+import heapq
+import itertools
+import os
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from seimei_calc import GRID_KEYS
+
+# ====== 設定 ======
+FORTUNE_FILE = "fortune_81.csv"   # 1〜81 の吉凶表（同梱）
+MAX_NUMBER = 81
+
+# 吉凶 → 点数
+LUCK_POINTS = {
+    "大吉": 3,
+    "吉": 2,
+    "半吉": 1,
+    "凶": 0,
+}
+
+# 格ごとの重み（人格・総格を重く見る）
+GRID_WEIGHTS = {
+    "トップ（天格）": 1,
+    "ハート（人格）": 3,
+    "フット（地格）": 2,
+    "サイド": 1,
+    "オール（総格）": 3,
+}
+
+
+# ====== ローダ ======
+def load_fortune() -> List[str]:
+    """fortune_81.csv を読み込み、数 → 吉凶 のリスト（添字=数, 0は空）を返す"""
+    path = os.path.join(os.path.dirname(__file__), FORTUNE_FILE)
+    luck = [""] * (MAX_NUMBER + 1)
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        rdr = csv.DictReader(f)
+        for row in rdr:
+            n = int((row.get("number") or "0").strip())
+            v = (row.get("luck") or "").strip()
+            if not 1 <= n <= MAX_NUMBER:
+                raise RuntimeError(f"{FORTUNE_FILE}: 範囲外の数 {n}")
+            if v not in LUCK_POINTS:
+                raise RuntimeError(f"{FORTUNE_FILE}: 未知の吉凶 '{v}' ({n})")
+            luck[n] = v
+    missing = [n for n in range(1, MAX_NUMBER + 1) if not luck[n]]
+    if missing:
+        raise RuntimeError(f"{FORTUNE_FILE}: 欠番 {missing}")
+    return luck
+
+_LUCK = load_fortune()
+
+def reduce_number(n: int) -> int:
+    """81 を超える数は 80 を引いて 1〜81 に戻す（82→2, 162→2）。0 以下は 0"""
+    if n <= 0:
+        return 0
+    return ((n - 1) % (MAX_NUMBER - 1)) + 1 if n > MAX_NUMBER else n
+
+def reduce_numbers(values) -> np.ndarray:
+    """reduce_number の配列版"""
+    v = np.asarray(values, dtype=np.int64)
+    v = np.where(v > MAX_NUMBER, (v - 1) % (MAX_NUMBER - 1) + 1, v)
+    return np.maximum(v, 0)
+
+def luck_of(n: int) -> str:
+    """数の吉凶（0 は対象外で空文字）"""
+    return _LUCK[reduce_number(n)]
+
+
+# ====== 点数表（格×数 を事前計算） ======
+def _build_points(weights: Dict[str, int]) -> Dict[str, List[int]]:
+    # 格ごとに「数 → 重み付き点数」の表を作っておき、採点は添字参照だけにする
+    base = [LUCK_POINTS.get(v, 0) for v in _LUCK]
+    return {k: [w * p for p in base] for k, w in weights.items()}
+
+def _points_matrix(points: Dict[str, List[int]]) -> np.ndarray:
+    # GRID_KEYS 順の (7, 82) の表。重みのない格の行は 0
+    m = np.zeros((len(GRID_KEYS), MAX_NUMBER + 1), dtype=np.int64)
+    for k, tbl in points.items():
+        m[GRID_KEYS.index(k)] = tbl
+    return m
+
+_POINTS = _build_points(GRID_WEIGHTS)
+_POINTS_MATRIX = _points_matrix(_POINTS)
+
+def score(res: dict, points: Optional[Dict[str, List[int]]] = None) -> int:
+    """calc の結果1件を5格の吉凶で採点する"""
+    pts = points or _POINTS
+    total = 0
+    for k, tbl in pts.items():
+        total += tbl[reduce_number(res.get(k) or 0)]
+    return total
+
+def score_grids(grids, weights: Optional[Dict[str, int]] = None) -> np.ndarray:
+    """
+    (件数, 7)（GRID_KEYS 順。seimei_vector.score_grids の戻り値）の5格をまとめて採点する。
+    数を 1〜81 に戻してから (7, 82) の点数表を添字で引き、行ごとに足す。
+    """
+    m = _points_matrix(_build_points(weights)) if weights else _POINTS_MATRIX
+    g = reduce_numbers(grids).reshape(-1, len(GRID_KEYS))
+    return m[np.arange(len(GRID_KEYS)), g].sum(axis=1)
+
+def score_many(
+    results: Union[Iterable[dict], np.ndarray],
+    weights: Optional[Dict[str, int]] = None,
+) -> List[int]:
+    """複数件をまとめて採点する（calc の結果の列、または (件数, 7) の配列）"""
+    if isinstance(results, np.ndarray):
+        grids = results
+    else:
+        grids = np.array([[r.get(k) or 0 for k in GRID_KEYS] for r in results], dtype=np.int64)
+    return score_grids(grids, weights).tolist()
+
+def fortune_of(res: dict) -> Dict[str, str]:
+    """5格それぞれの吉凶"""
+    return {k: luck_of(res.get(k) or 0) for k in GRID_WEIGHTS}
+
+
+# ====== 上位k件 ======
+def top_k(
+    items: Iterable[Tuple[str, str, dict]],
+    k: int,
+    points: Optional[Dict[str, List[int]]] = None,
+) -> List[Tuple[int, str, str, dict]]:
+    """
+    (姓, 名, 結果) の列から点数上位 k 件を返す。
+    大きさ k のヒープだけを保持するので、入力全体を並べ替えない。
+    同点は入力順を優先する。
+    """
+    if k <= 0:
+        return []
+    heap: List[Tuple[int, int, str, str, dict]] = []
+    seq = itertools.count()
+    for family, given, res in items:
+        # 同点は先に来たものを残したいので、順序は負の通し番号で比較する
+        entry = (score(res, points), -next(seq), family, given, res)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    heap.sort(key=lambda e: e[:2], reverse=True)
+    return [(s, family, given, res) for s, _, family, given, res in heap]
+
+
+def main():
+    from seimei_batch import read_names, score_names
+    from seimei_calc import load_dict
+
+    ap = argparse.ArgumentParser(description="名前リストを5格の吉凶で採点し上位を表示")
+    ap.add_argument("names_csv", help="family, given 列を持つCSV")
+    ap.add_argument("--top", "-k", type=int, default=20, help="表示件数")
+    ap.add_argument("--allowed-only", action="store_true", help="名に使えない字を含む行を除く（seimei_allowed）")
+    args = ap.parse_args()
+
+    table = load_dict()
+    names = read_names(args.names_csv)
+    if args.allowed_only:
+        from seimei_allowed import load_allowed, prefilter
+        names = prefilter(names, load_allowed(table))
+    best = top_k(score_names(names, table), args.top)
+    for rank, (s, family, given, res) in enumerate(best, start=1):
+        luck = " ".join(f"{k[:3]}={res[k]}({v})" for k, v in fortune_of(res).items())
+        print(f"{rank:>3}. {family} {given}  点数={s}  {luck}")
+
+if __name__ == "__main__":
+    main()
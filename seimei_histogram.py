@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+import argparse
+import csv
+import itertools
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from seimei_calc import GRID_FIELDS, GRID_KEYS, dictionary_version
+from seimei_fortune import MAX_NUMBER, luck_of, reduce_numbers
+from seimei_store import ALIASES
+from seimei_profiling import add_profile_args, profiled
+
+# 名前ファイル全体の 格の値の分布（ヒストグラム）と、2つの格の同時分布を集計する。
+# 名前は CHUNK_ROWS 行ずつ seimei_vector で一括計算し、その場で固定長の件数配列に足し込むだけなので、
+# 行ごとの結果は残らず、メモリは入力の件数によらず一定。
+# 値は seimei_fortune と同じく 81 を超えたら 1〜81 に戻して数える（0 は 0 のまま）。
+# シャードごとに作った JSON は merge で足し合わせられる（同じ辞書の版どうしだけ）。
+#
+# 使い方例:
+# python seimei_histogram.py build names.csv --output hist.json --csv hist.csv
+# python seimei_histogram.py build names.csv --allowed-only    # 名に使えない字を含む行を除く
+# python seimei_histogram.py merge shard1.json shard2.json --output all.json
+# python seimei_histogram.py show all.json --field 総格
+
+BINS = MAX_NUMBER + 1          # 0〜81
+CHUNK_ROWS = 65536             # 一度に計算する行数
+JOINT_FIELDS = ("top", "heart", "foot", "side", "allv")   # 同時分布を取る格（天・人・地・外・総）
+FORMAT = "seimei-histogram/1"
+
+
+def fold(values: np.ndarray) -> np.ndarray:
+    """81 を超える値を 1〜81 に戻す（seimei_fortune.reduce_numbers）"""
+    return reduce_numbers(values)
+
+
+class GridHistogram:
+    """
+    格ごとの件数 counts[格] (BINS,) と、格の組ごとの件数 joint[(格, 格)] (BINS, BINS)。
+    add で (行数, 7) の 5格を足し込み、merge で別のヒストグラムを足す。
+    """
+
+    def __init__(self, joint_fields: Sequence[str] = JOINT_FIELDS, dict_version: str = ""):
+        self.dict_version = dict_version
+        self.n = 0
+        self.counts = np.zeros((len(GRID_FIELDS), BINS), dtype=np.int64)
+        self.pairs: List[Tuple[str, str]] = list(itertools.combinations(joint_fields, 2))
+        self.joint = np.zeros((len(self.pairs), BINS, BINS), dtype=np.int64)
+
+    def add(self, grids) -> None:
+        g = fold(np.asarray(grids).reshape(-1, len(GRID_FIELDS)))
+        if not len(g):
+            return
+        self.n += len(g)
+        for j in range(len(GRID_FIELDS)):
+            self.counts[j] += np.bincount(g[:, j], minlength=BINS)
+        for k, (a, b) in enumerate(self.pairs):
+            key = g[:, GRID_FIELDS.index(a)] * BINS + g[:, GRID_FIELDS.index(b)]
+            self.joint[k] += np.bincount(key, minlength=BINS * BINS).reshape(BINS, BINS)
+
+    def merge(self, other: "GridHistogram") -> "GridHistogram":
+        if other.pairs != self.pairs:
+            raise ValueError("同時分布の格の組が違うヒストグラムは足せません")
+        if self.dict_version and other.dict_version and self.dict_version != other.dict_version:
+            raise ValueError(f"辞書の版が違います: {self.dict_version} / {other.dict_version}")
+        self.dict_version = self.dict_version or other.dict_version
+        self.n += other.n
+        self.counts += other.counts
+        self.joint += other.joint
+        return self
+
+    # ====== 参照 ======
+    def field_counts(self, field: str) -> np.ndarray:
+        return self.counts[GRID_FIELDS.index(field)]
+
+    def joint_counts(self, a: str, b: str) -> np.ndarray:
+        """(a の値, b の値) の件数。組の順が逆なら転置して返す"""
+        if (a, b) in self.pairs:
+            return self.joint[self.pairs.index((a, b))]
+        if (b, a) in self.pairs:
+            return self.joint[self.pairs.index((b, a))].T
+        raise ValueError(f"同時分布がありません: {a} × {b}")
+
+    def luck_counts(self, field: str) -> Dict[str, int]:
+        """吉凶ごとの件数（0 は数えない）"""
+        out: Dict[str, int] = {}
+        for v, c in enumerate(self.field_counts(field).tolist()):
+            if v and c:
+                out[luck_of(v)] = out.get(luck_of(v), 0) + c
+        return out
+
+    def mean(self, field: str) -> float:
+        c = self.field_counts(field)
+        return float((c * np.arange(BINS)).sum() / c.sum()) if c.sum() else 0.0
+
+    # ====== 書き出し・読み込み ======
+    def to_dict(self) -> dict:
+        """JSON 用。件数が 0 の値は省く（同時分布は [a の値, b の値, 件数] の列）"""
+        return {
+            "format": FORMAT,
+            "dict_version": self.dict_version,
+            "n": self.n,
+            "fields": {
+                f: {str(v): c for v, c in enumerate(self.counts[j].tolist()) if c}
+                for j, f in enumerate(GRID_FIELDS)
+            },
+            "joint": {
+                f"{a}:{b}": [[int(x), int(y), int(m[x, y])] for x, y in zip(*np.nonzero(m))]
+                for (a, b), m in zip(self.pairs, self.joint)
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "GridHistogram":
+        if d.get("format") != FORMAT:
+            raise ValueError(f"ヒストグラムの形式が違います: {d.get('format')}")
+        pairs = [tuple(k.split(":")) for k in d["joint"]]
+        fields = list(dict.fromkeys(f for p in pairs for f in p))
+        h = cls(fields, d.get("dict_version", ""))
+        if h.pairs != pairs:
+            raise ValueError("同時分布の格の組が読み取れません")
+        h.n = int(d["n"])
+        for j, f in enumerate(GRID_FIELDS):
+            for v, c in d["fields"].get(f, {}).items():
+                h.counts[j, int(v)] = c
+        for k, key in enumerate(d["joint"]):
+            for x, y, c in d["joint"][key]:
+                h.joint[k, x, y] = c
+        return h
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def read_json(cls, path: str) -> "GridHistogram":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def write_csv(self, path: str) -> int:
+        """縦長のCSV（kind, field, value, field2, value2, count）。件数が 0 の行は省く"""
+        rows = 0
+        with open(path, "w", encoding="utf-8-sig", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["kind", "field", "value", "field2", "value2", "count"])
+            for j, field in enumerate(GRID_FIELDS):
+                for v in np.flatnonzero(self.counts[j]).tolist():
+                    w.writerow(["field", field, v, "", "", int(self.counts[j, v])])
+                    rows += 1
+            for (a, b), m in zip(self.pairs, self.joint):
+                for x, y in zip(*np.nonzero(m)):
+                    w.writerow(["joint", a, int(x), b, int(y), int(m[x, y])])
+                    rows += 1
+        return rows
+
+
+# ====== 集計 ======
+def _chunks(names: Iterable[Tuple[str, str]], size: int) -> Iterator[List[Tuple[str, str]]]:
+    it = iter(names)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def build_histogram(
+    names: Iterable[Tuple[str, str]],
+    table: Dict[str, int],
+    joint_fields: Sequence[str] = JOINT_FIELDS,
+    chunk_rows: int = CHUNK_ROWS,
+) -> GridHistogram:
+    """(姓, 名) の列を chunk_rows 行ずつ計算して足し込む"""
+    from seimei_vector import score_grids
+
+    h = GridHistogram(joint_fields, dictionary_version(table))
+    for chunk in _chunks(names, chunk_rows):
+        h.add(score_grids(chunk, table))
+    return h
+
+
+def _field(name: str) -> str:
+    field = ALIASES.get(name.strip())
+    if field not in GRID_FIELDS:
+        raise SystemExit(f"未知の格: {name}")
+    return field
+
+def _write(h: GridHistogram, output: str, csv_path: Optional[str]) -> None:
+    h.write_json(output)
+    print(f"書き出し: {output} / {h.n}件 (辞書 {h.dict_version})")
+    if csv_path:
+        print(f"書き出し: {csv_path} / {h.write_csv(csv_path)}行")
+
+def run(args: argparse.Namespace) -> None:
+    from seimei_batch import read_names
+    from seimei_calc import load_dict
+
+    if args.cmd == "build":
+        table = load_dict()
+        names = read_names(args.names_csv)
+        rejected = [0]
+        if args.allowed_only:
+            from seimei_allowed import load_allowed, prefilter
+
+            def count(family: str, given: str) -> None:
+                rejected[0] += 1
+            names = prefilter(names, load_allowed(table), count)
+        h = build_histogram(names, table, [_field(f) for f in args.joint], args.chunk_rows)
+        _write(h, args.output, args.csv)
+        if args.allowed_only:
+            print(f"除外: 名に使えない字を含む {rejected[0]}件")
+    elif args.cmd == "merge":
+        h = None
+        for path in args.inputs:
+            try:
+                other = GridHistogram.read_json(path)
+                h = other if h is None else h.merge(other)
+            except ValueError as e:
+                raise SystemExit(f"{path} を足せません: {e}")
+        _write(h, args.output, args.csv)
+    else:
+        h = GridHistogram.read_json(args.input)
+        print(f"{args.input}: {h.n}件 (辞書 {h.dict_version})")
+        fields = [_field(f) for f in args.field] if args.field else list(GRID_FIELDS)
+        for field in fields:
+            c = h.field_counts(field)
+            top = np.argsort(-c, kind="stable")[:5]
+            print(f"== {GRID_KEYS[GRID_FIELDS.index(field)]}: 平均 {h.mean(field):.2f}")
+            print("   多い値: " + ", ".join(f"{v}={c[v]}" for v in top.tolist() if c[v]))
+            print("   吉凶:   " + ", ".join(f"{k}={v}" for k, v in h.luck_counts(field).items()))
+
+def main():
+    ap = argparse.ArgumentParser(description="格の値の分布と同時分布を一定のメモリで集計する")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("build", help="名前リストCSVから作る")
+    p.add_argument("names_csv", help="family, given 列を持つCSV")
+    p.add_argument("--joint", nargs="*", default=list(JOINT_FIELDS), help="同時分布を取る格（例: 天格 人格 総格）")
+    p.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    p.add_argument("--allowed-only", action="store_true", help="名に使えない字を含む行を除いて集計する（seimei_allowed）")
+    p = sub.add_parser("merge", help="シャードごとの JSON を足し合わせる")
+    p.add_argument("inputs", nargs="+")
+    for p in sub.choices.values():
+        p.add_argument("--output", default="histogram.json")
+        p.add_argument("--csv", default=None, help="縦長のCSVも書き出す")
+    p = sub.add_parser("show", help="JSON の中身を表示")
+    p.add_argument("input")
+    p.add_argument("--field", nargs="*", default=None, help="表示する格（既定: すべて）")
+    add_profile_args(sub.choices["build"])
+    add_profile_args(sub.choices["merge"])
+    args = ap.parse_args()
+    with profiled(args, "seimei_histogram"):
+        run(args)
+
+if __name__ == "__main__":
+    main()
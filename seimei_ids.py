@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+import argparse
+import csv
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from seimei_calc import DERIVED_FILE, dictionary_snapshot, load_dict
+
+# 辞書にない字の画数を、IDS（漢字構成記述列）で部品に分けて足し合わせて求める。
+# IDS ファイルは cjkvi-ids（https://github.com/cjkvi/cjkvi-ids の ids.txt）などの
+#   U+6D77<TAB>海<TAB>⿰氵每[GTKV]<TAB>...
+# の形（1行1字、IDS は複数あってよい。[...] は地域の注記）を読む。
+#
+# 部品の画数は 辞書（+ kanji_overrides.csv）→ 部首（radicals_master_fixed.csv）→ 基本の部品（COMPONENT_STROKES）
+# → さらに分解 の順に引く。
+# 部首の画数は strokes_custom を使う。この辞書の数え方で、氵=4・扌=4 のように元の字で数える偏と
+# 艹=3・阝=3 のように見た目のまま数える部首が混ざっている（旧字体の 艸=6 の数え方ではない）。
+# 偏・冠など部首の位置（分解の最初の部品。「阝(右)」は ⿰ の右）に来たときだけ当てはめる。
+# 部品ごとの結果はメモしておき、同じ部品は一度しか分解しない（循環・深さの上限で打ち切った結果は
+# 呼び出し元しだいで変わるのでメモしない）。
+# 結果は kanji_derived_strokes.csv（char, strokes, ids）に書き、seimei_calc が最後の手段として引く。
+# 異体字の表（kanji_variants.csv / VARIANT_MAP）にある字は normalize_name で写されてから引かれるので、
+# ここで求めた 髙・﨑 などの画数が使われるのは 向きが none のときだけ。
+#
+# 使い方例:
+# python seimei_ids.py build ids.txt                  # 辞書にない字をすべて推定して書き出す
+# python seimei_ids.py build ids.txt --chars names.txt  # 名前に出てくる字だけ
+# python seimei_ids.py show ids.txt 𠮷 髙 﨑
+
+RADICALS_FILE = "radicals_master_fixed.csv"
+IDS_OPERATORS = {c: 2 for c in "⿰⿱⿴⿵⿶⿷⿸⿹⿺⿻"}
+IDS_OPERATORS.update({"⿲": 3, "⿳": 3})
+# 辞書にない基本の部品（字として使われない形）の画数。辞書・部首の表にあればそちらが優先
+COMPONENT_STROKES = {
+    "亠": 2, "冂": 2, "冖": 2, "宀": 3, "丶": 1, "丿": 1, "丨": 1, "乛": 1, "亅": 1, "乚": 1, "𠃌": 1, "㇒": 1,
+    "㇏": 1, "𠂉": 2, "⺌": 3, "⺍": 3, "丷": 2, "䒑": 3, "儿": 2, "勹": 2, "匚": 2, "匸": 2, "卜": 2, "厂": 2,
+    "丆": 2, "冫": 2, "几": 2, "凵": 2, "刂": 2, "卩": 2, "厶": 2, "㐅": 2, "乂": 2, "𠂇": 2, "𠂊": 2, "⺈": 2,
+    "龴": 2, "𠆢": 2, "亻": 2, "彡": 3, "彐": 3, "⺕": 3, "彑": 3, "廴": 3, "廾": 3, "弋": 3, "夂": 3, "夊": 3,
+    "丬": 3, "屮": 3, "巛": 3, "尣": 3, "𡗗": 3, "辶": 3, "艹": 3, "爫": 4, "耂": 4, "灬": 4, "爿": 4, "攵": 4,
+    "歹": 4, "殳": 4, "礻": 4, "⺩": 4, "冃": 4, "龶": 4, "罒": 5, "癶": 5, "疒": 5, "禸": 5, "衤": 5, "𦍌": 6,
+    "糹": 6, "釒": 8, "飠": 8,
+}
+MAX_DEPTH = 16   # 分解の深さの上限（循環した IDS への備え）
+
+_TOKEN = re.compile(r"&[^;]+;|\{[^}]*\}|.")
+
+
+def load_ids(path: str) -> Dict[str, List[str]]:
+    """IDS ファイルを 字 → [IDS, ...]（注記を除いたもの）にする"""
+    out: Dict[str, List[str]] = {}
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for line in f:
+            if line.startswith(("#", ";")) or not line.strip():
+                continue
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) < 3:
+                continue
+            ch = cols[1]
+            seqs = [re.sub(r"\[[^\]]*\]", "", c).strip() for c in cols[2:]]
+            seqs = [s.lstrip("^").rstrip("$") for s in seqs if s]
+            if seqs:
+                out.setdefault(ch, []).extend(seqs)
+    return out
+
+def parse_ids(seq: str) -> Optional[list]:
+    """IDS を木（部品の字、または [演算子, 子, ...]）にする。形が崩れていれば None"""
+    tokens = _TOKEN.findall(seq)
+    pos = 0
+
+    def node():
+        nonlocal pos
+        if pos >= len(tokens):
+            raise ValueError(seq)
+        t = tokens[pos]
+        pos += 1
+        n = IDS_OPERATORS.get(t)
+        if n is None:
+            return t
+        return [t] + [node() for _ in range(n)]
+
+    try:
+        tree = node()
+    except ValueError:
+        return None
+    return tree if pos == len(tokens) else None
+
+def load_radicals(path: Optional[str] = None) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    radicals_master_fixed.csv の別名 → strokes_custom を
+    (部品の最初に来たとき, ⿰ の右に来たとき) の2つの表にする。
+    """
+    path = path or os.path.join(os.path.dirname(__file__), RADICALS_FILE)
+    first: Dict[str, int] = {}
+    right: Dict[str, int] = {}
+    try:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                try:
+                    v = int((row.get("strokes_custom") or "").strip())
+                except ValueError:
+                    continue
+                for a in (row.get("aliases") or "").split("|"):
+                    a = a.strip()
+                    if a.endswith("(右)"):
+                        right[a[:-3]] = v
+                    elif a.endswith("(左)"):
+                        first[a[:-3]] = v
+                    elif a:
+                        first[a] = v
+    except FileNotFoundError:
+        pass
+    return first, right
+
+
+class IdsDeriver:
+    """
+    IDS で部品に分けて画数を求める。known は 字→画数（辞書）。
+    求まらない字（部品のどれかが辞書にも部首にもなく、分解もできない）は None。
+    """
+
+    def __init__(
+        self,
+        ids: Dict[str, List[str]],
+        known: Dict[str, int],
+        radicals: Optional[Tuple[Dict[str, int], Dict[str, int]]] = None,
+    ):
+        self.ids = ids
+        self.known = known
+        self.first, self.right = radicals if radicals is not None else load_radicals()
+        self._memo: Dict[str, Optional[int]] = {}
+        self._used: Dict[str, str] = {}   # 字 → 使った IDS
+        self._cutoffs = 0                 # 循環・深さの上限で打ち切った回数
+
+    def strokes(self, ch: str) -> Optional[int]:
+        return self._strokes(ch, 0, set())
+
+    def ids_for(self, ch: str) -> str:
+        """strokes で使った IDS（辞書にある字・求まらない字は空）"""
+        return self._used.get(ch, "")
+
+    def _strokes(self, ch: str, depth: int, active: Set[str]) -> Optional[int]:
+        if ch in self.known:
+            return self.known[ch]
+        if ch in COMPONENT_STROKES:
+            return COMPONENT_STROKES[ch]
+        if ch in self._memo:
+            return self._memo[ch]
+        if depth > MAX_DEPTH or ch in active:
+            self._cutoffs += 1
+            return None
+        cutoffs = self._cutoffs
+        active.add(ch)
+        v = None
+        for seq in self.ids.get(ch, ()):
+            tree = parse_ids(seq)
+            if tree is None or tree == ch:
+                continue
+            v = self._tree(tree, depth + 1, active)
+            if v is not None:
+                self._used[ch] = seq
+                break
+        active.discard(ch)
+        if self._cutoffs == cutoffs:
+            self._memo[ch] = v
+        return v
+
+    def _tree(self, tree, depth: int, active: Set[str]) -> Optional[int]:
+        if isinstance(tree, str):
+            return self._strokes(tree, depth, active)
+        op, *parts = tree
+        total = 0
+        for i, part in enumerate(parts):
+            v = None
+            if isinstance(part, str):
+                if i == 0 and part in self.first:
+                    v = self.first[part]
+                elif op == "⿰" and i == 1 and part in self.right:
+                    v = self.right[part]
+            if v is None:
+                v = self._tree(part, depth, active)
+            if v is None:
+                return None
+            total += v
+        return total
+
+
+def derive_table(
+    deriver: IdsDeriver,
+    chars: Iterable[str],
+) -> Tuple[List[Tuple[str, int, str]], List[str]]:
+    """
+    辞書にない字の (字, 画数, IDS) と、求まらなかった字。
+    基本の部品と、それ以上分けられない字（IDS が自分自身だけ）は対象にしない。
+    """
+    rows: List[Tuple[str, int, str]] = []
+    missing: List[str] = []
+    for ch in dict.fromkeys(chars):
+        if ch in deriver.known or ch in COMPONENT_STROKES:
+            continue
+        if all(seq == ch for seq in deriver.ids.get(ch, [ch])):
+            continue
+        v = deriver.strokes(ch)
+        if v is None:
+            missing.append(ch)
+        else:
+            rows.append((ch, v, deriver.ids_for(ch)))
+    return rows, missing
+
+def write_derived(path: str, rows: Iterable[Tuple[str, int, str]]) -> int:
+    rows = sorted(rows)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["char", "strokes", "ids"])
+        w.writerows(rows)
+    os.replace(tmp, path)
+    return len(rows)
+
+def _known(masters: List[str]) -> Dict[str, int]:
+    """部品の画数に使う表（後に指定したマスタほど優先、最後に kanji_overrides.csv。前回の推定は含めない）"""
+    known: Dict[str, int] = {}
+    for m in masters:
+        known.update({k: v for k, v in load_dict(m).items() if v > 0})
+    return {k: v for k, v in dictionary_snapshot(known, derived=False).items() if v > 0}
+
+def _chars_of(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return [ch for ch in f.read() if not ch.isspace() and ch not in ","]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="IDS で部品に分けて、辞書にない字の画数表を作る")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("build", help=f"{DERIVED_FILE} を作り直す")
+    p.add_argument("ids", help="IDS ファイル（例: cjkvi-ids の ids.txt）")
+    p.add_argument("--chars", default=None, help="この（テキスト/CSV）ファイルに出てくる字だけを推定する")
+    p.add_argument("--output", default=None, help=f"既定: {DERIVED_FILE}")
+    p = sub.add_parser("show", help="字ごとの推定を表示")
+    p.add_argument("ids", help="IDS ファイル")
+    p.add_argument("chars", nargs="+")
+    for p in sub.choices.values():
+        p.add_argument("--master", nargs="*", default=[None],
+                       help="部品の画数に使うマスタCSV（既定: kanji_master_joyo.csv。複数なら後ろが優先）")
+    args = ap.parse_args()
+
+    ids = load_ids(args.ids)
+    deriver = IdsDeriver(ids, _known(args.master))
+    if args.cmd == "build":
+        chars = _chars_of(args.chars) if args.chars else list(ids)
+        rows, missing = derive_table(deriver, chars)
+        out = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), DERIVED_FILE)
+        n = write_derived(out, rows)
+        print(f"書き出し: {out} / {n}字（求まらない字 {len(missing)}字）")
+        if missing:
+            print("  例: " + "".join(missing[:40]))
+    else:
+        for ch in "".join(args.chars):
+            if ch in deriver.known:
+                print(f"{ch}: {deriver.known[ch]}（辞書）")
+                continue
+            v = deriver.strokes(ch)
+            print(f"{ch}: {v if v is not None else '?'}  {deriver.ids_for(ch)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+import argparse
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# 各スクリプト共通の --profile / --trace-alloc オプション。
+#
+#   --profile [PATH]      cProfile の統計を PATH（既定: <スクリプト名>-<時刻>.prof）に保存し、
+#                         累積時間の上位を同名の .txt にも書く（snakeviz などでも開ける）
+#   --trace-alloc [PATH]  tracemalloc で割り当て元の上位を PATH（既定: <スクリプト名>-<時刻>.alloc.txt）に書く
+#   --trace-top N         上位何件を書くか（既定 30）
+#
+# 組み込み方:
+#   add_profile_args(ap)
+#   args = ap.parse_args()
+#   with profiled(args, "seimei_cli"):
+#       main(...)
+#
+# multiprocessing のワーカーは親の計測に含まれないので、ワーカー側で
+#   with profiled(worker_args(args, i), f"<スクリプト名>-{i}"):
+# のように1プロセス1ファイルで計測する。
+
+TOP_N = 30
+TRACE_FRAMES = 10   # tracemalloc が保持する呼び出し元の深さ
+
+
+def add_profile_args(ap: argparse.ArgumentParser) -> None:
+    g = ap.add_argument_group("プロファイル")
+    g.add_argument("--profile", nargs="?", const="", default=None, metavar="PATH",
+                   help="cProfile の統計をファイルに保存")
+    g.add_argument("--trace-alloc", nargs="?", const="", default=None, metavar="PATH",
+                   help="tracemalloc で割り当て元の上位をファイルに保存")
+    g.add_argument("--trace-top", type=int, default=TOP_N, help="書き出す上位件数")
+
+def worker_args(args: argparse.Namespace, i: int) -> argparse.Namespace:
+    """ワーカープロセス i 用の設定（PATH を指定していれば <PATH>-<i>.<拡張子> に書く）"""
+    out = argparse.Namespace(**vars(args))
+    for k in ("profile", "trace_alloc"):
+        path = getattr(args, k, None)
+        if path:
+            root, ext = os.path.splitext(path)
+            setattr(out, k, f"{root}-{i}{ext}")
+    return out
+
+def _default_path(name: str, suffix: str) -> str:
+    return f"{name}-{time.strftime('%Y%m%d-%H%M%S')}{suffix}"
+
+def _write_profile(prof: cProfile.Profile, path: str, top: int) -> None:
+    prof.dump_stats(path)
+    buf = io.StringIO()
+    st = pstats.Stats(prof, stream=buf)
+    st.sort_stats("cumulative").print_stats(top)
+    st.sort_stats("tottime").print_stats(top)
+    with open(os.path.splitext(path)[0] + ".txt", "w", encoding="utf-8") as f:
+        f.write(buf.getvalue())
+
+def _write_alloc(snapshot: tracemalloc.Snapshot, peak: int, path: str, top: int) -> None:
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ))
+    stats = snapshot.statistics("lineno")
+    total = sum(s.size for s in stats)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"# 現在の割り当て合計: {total / 1024:.1f} KiB / ピーク: {peak / 1024:.1f} KiB\n")
+        f.write(f"# 割り当て元（行単位）上位 {top}\n")
+        for i, s in enumerate(stats[:top], start=1):
+            f.write(f"{i:>3}. {s.size / 1024:10.1f} KiB {s.count:>8} blocks  {s.traceback[0]}\n")
+        f.write(f"\n# 呼び出し経路つき 上位 {min(top, 10)}\n")
+        for s in snapshot.statistics("traceback")[:min(top, 10)]:
+            f.write(f"\n{s.size / 1024:.1f} KiB / {s.count} blocks\n")
+            for line in s.traceback.format():
+                f.write(line + "\n")
+
+
+@contextmanager
+def profiled(args: argparse.Namespace, name: str) -> Iterator[None]:
+    """args.profile / args.trace_alloc が指定されていれば、ブロックの実行を計測してファイルに書く"""
+    prof_path: Optional[str] = getattr(args, "profile", None)
+    alloc_path: Optional[str] = getattr(args, "trace_alloc", None)
+    top = getattr(args, "trace_top", TOP_N)
+
+    prof = None
+    if alloc_path is not None:
+        tracemalloc.start(TRACE_FRAMES)
+    if prof_path is not None:
+        prof = cProfile.Profile()
+        prof.enable()
+    try:
+        yield
+    finally:
+        if prof is not None:
+            prof.disable()
+        if alloc_path is not None:
+            # 統計の書き出し自体の割り当てを含めないよう、先にスナップショットを取る
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        if prof is not None:
+            path = prof_path or _default_path(name, ".prof")
+            _write_profile(prof, path, top)
+            print(f"[profile] {path}")
+        if alloc_path is not None:
+            path = alloc_path or _default_path(name, ".alloc.txt")
+            _write_alloc(snapshot, peak, path, top)
+            print(f"[trace-alloc] {path}")
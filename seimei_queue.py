@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+import argparse
+import csv
+import hashlib
+import json
+import os
+import socket
+import time
+from typing import Dict, List, Optional
+
+from seimei_batch import read_names, score_batch
+from seimei_calc import GRID_KEYS, dictionary_version, load_dict
+from seimei_profiling import add_profile_args, profiled, worker_args
+
+# 共有ファイルシステム上のディレクトリを作業キューとして使う。
+#
+#   <queue>/manifest.json        分割情報（シャード一覧・行数・ハッシュ）
+#   <queue>/shards/00000.csv     入力シャード
+#   <queue>/todo/00000           未着手の印
+#   <queue>/claimed/00000        作業中（todo からの rename で取得。mtime が心拍）
+#   <queue>/out/00000.csv        シャードの結果（dict_version 列つき）
+#   <queue>/done/00000.json      完了の印（worker・辞書版・件数・所要時間）
+#
+# rename は同じファイルシステム内で原子的なので、同じシャードを2台が取ることはない。
+# 心拍が途絶えた claimed は reclaim で todo に戻す。
+#
+# 使い方例:
+# python seimei_queue.py split names.csv /mnt/share/q --shard-size 50000
+# python seimei_queue.py work /mnt/share/q            # 各マシンで実行
+# python seimei_queue.py merge /mnt/share/q --output results.csv
+# python seimei_queue.py local names.csv /tmp/q --workers 4 --output results.csv  # 1台で確認
+
+MANIFEST = "manifest.json"
+SHARD_SIZE = 50000
+RECLAIM_AFTER = 600.0     # 心拍がこの秒数途絶えた claimed を取り戻す
+HEARTBEAT_EVERY = 2000    # 何行ごとに心拍を打つか
+OUT_FIELDS = ["姓", "名"] + list(GRID_KEYS) + ["dict_version"]
+
+
+def _dirs(qdir: str) -> Dict[str, str]:
+    return {d: os.path.join(qdir, d) for d in ("shards", "todo", "claimed", "out", "done")}
+
+def _write_atomic(path: str, write) -> None:
+    # 共有ディレクトリには複数マシンから書くので、一時ファイル名は pid だけでなくホスト名も入れる
+    tmp = f"{path}.{worker_id()}.tmp"
+    with open(tmp, "w", encoding="utf-8-sig" if path.endswith(".csv") else "utf-8", newline="") as f:
+        write(f)
+    os.replace(tmp, path)
+
+def _touch(path: str) -> None:
+    # 再取得されて手元の claimed が消えていても処理は続ける（結果は同じ内容で上書きされる）
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+# ====== 分割 ======
+def split(names_csv: str, qdir: str, shard_size: int = SHARD_SIZE) -> dict:
+    """名前リストをシャードに分け、マニフェストと todo の印を作る"""
+    dirs = _dirs(qdir)
+    for d in dirs.values():
+        os.makedirs(d, exist_ok=True)
+    if os.path.exists(os.path.join(qdir, MANIFEST)):
+        raise RuntimeError(f"すでに分割済みです: {qdir}")
+
+    shards: List[dict] = []
+
+    def flush(rows: List[List[str]]) -> None:
+        sid = f"{len(shards):05d}"
+        path = os.path.join(dirs["shards"], sid + ".csv")
+
+        def write(f):
+            w = csv.writer(f)
+            w.writerow(["family", "given"])
+            w.writerows(rows)
+        _write_atomic(path, write)
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        shards.append({"id": sid, "rows": len(rows), "sha256": digest})
+
+    buf: List[List[str]] = []
+    for family, given in read_names(names_csv):
+        buf.append([family, given])
+        if len(buf) >= shard_size:
+            flush(buf)
+            buf = []
+    if buf:
+        flush(buf)
+
+    manifest = {
+        "source": os.path.abspath(names_csv),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "shard_size": shard_size,
+        "rows": sum(s["rows"] for s in shards),
+        "shards": shards,
+    }
+    _write_atomic(os.path.join(qdir, MANIFEST), lambda f: json.dump(manifest, f, ensure_ascii=False, indent=2))
+    # マニフェストを書いてから todo を出す（途中で落ちても半端なキューにならない）
+    for s in shards:
+        open(os.path.join(dirs["todo"], s["id"]), "w").close()
+    return manifest
+
+def load_manifest(qdir: str) -> dict:
+    with open(os.path.join(qdir, MANIFEST), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ====== 取得・再取得 ======
+def claim(qdir: str) -> Optional[str]:
+    """未着手のシャードを1つ取る（なければ None）"""
+    dirs = _dirs(qdir)
+    for sid in sorted(os.listdir(dirs["todo"])):
+        try:
+            os.rename(os.path.join(dirs["todo"], sid), os.path.join(dirs["claimed"], sid))
+        except FileNotFoundError:
+            continue   # 他のワーカーが先に取った
+        _touch(os.path.join(dirs["claimed"], sid))
+        return sid
+    return None
+
+def reclaim(qdir: str, older_than: float = RECLAIM_AFTER) -> List[str]:
+    """心拍が older_than 秒以上途絶えた作業中シャードを todo に戻す"""
+    dirs = _dirs(qdir)
+    now = time.time()
+    back: List[str] = []
+    for sid in sorted(os.listdir(dirs["claimed"])):
+        path = os.path.join(dirs["claimed"], sid)
+        try:
+            if now - os.stat(path).st_mtime < older_than:
+                continue
+            if os.path.exists(os.path.join(dirs["done"], sid + ".json")):
+                os.remove(path)   # 完了の印を書いた直後に落ちたもの
+                continue
+            os.rename(path, os.path.join(dirs["todo"], sid))
+        except FileNotFoundError:
+            continue
+        back.append(sid)
+    return back
+
+
+# ====== 実行 ======
+def process_shard(qdir: str, sid: str, table: Dict[str, int], version: str, worker: str) -> int:
+    dirs = _dirs(qdir)
+    claimed = os.path.join(dirs["claimed"], sid)
+    t0 = time.perf_counter()
+    names = list(read_names(os.path.join(dirs["shards"], sid + ".csv")))
+    results, _ = score_batch(names, table, compact=True)
+
+    def write(f):
+        w = csv.writer(f)
+        w.writerow(OUT_FIELDS)
+        for i, ((family, given), res) in enumerate(zip(names, results), start=1):
+            w.writerow([family, given] + [res[k] for k in GRID_KEYS] + [version])
+            if i % HEARTBEAT_EVERY == 0:
+                _touch(claimed)
+    _write_atomic(os.path.join(dirs["out"], sid + ".csv"), write)
+
+    stamp = {
+        "id": sid,
+        "worker": worker,
+        "dict_version": version,
+        "rows": len(names),
+        "seconds": round(time.perf_counter() - t0, 3),
+        "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    _write_atomic(os.path.join(dirs["done"], sid + ".json"), lambda f: json.dump(stamp, f, ensure_ascii=False))
+    try:
+        os.remove(claimed)
+    except FileNotFoundError:
+        pass
+    return len(names)
+
+def work(qdir: str, reclaim_after: float = RECLAIM_AFTER, worker: Optional[str] = None) -> int:
+    """todo がなくなるまでシャードを取って処理する。処理した行数を返す"""
+    worker = worker or worker_id()
+    table = load_dict()
+    version = dictionary_version(table)
+    total = 0
+    while True:
+        sid = claim(qdir)
+        if sid is None:
+            if not reclaim(qdir, reclaim_after):
+                break
+            continue
+        n = process_shard(qdir, sid, table, version, worker)
+        total += n
+        print(f"[{worker}] {sid}: {n}件")
+    return total
+
+
+# ====== 結合 ======
+def status(qdir: str) -> Dict[str, int]:
+    dirs = _dirs(qdir)
+    return {
+        "todo": len(os.listdir(dirs["todo"])),
+        "claimed": len(os.listdir(dirs["claimed"])),
+        "done": len([p for p in os.listdir(dirs["done"]) if p.endswith(".json")]),
+        "shards": len(load_manifest(qdir)["shards"]),
+    }
+
+def merge(qdir: str, output: str) -> int:
+    """全シャードの結果をマニフェスト順に1つのCSVにまとめる"""
+    dirs = _dirs(qdir)
+    manifest = load_manifest(qdir)
+    versions = set()
+    missing = []
+    for s in manifest["shards"]:
+        try:
+            with open(os.path.join(dirs["done"], s["id"] + ".json"), "r", encoding="utf-8") as f:
+                stamp = json.load(f)
+        except FileNotFoundError:
+            missing.append(s["id"])
+            continue
+        if stamp["rows"] != s["rows"]:
+            raise RuntimeError(f"シャード {s['id']} の件数が一致しません ({stamp['rows']} != {s['rows']})")
+        versions.add(stamp["dict_version"])
+    if missing:
+        raise RuntimeError(f"未完了のシャードがあります: {', '.join(missing)}")
+    if len(versions) > 1:
+        print(f"警告: 複数の辞書版で計算されています: {', '.join(sorted(versions))}")
+
+    n = 0
+
+    def write(f):
+        nonlocal n
+        w = csv.writer(f)
+        w.writerow(OUT_FIELDS)
+        for s in manifest["shards"]:
+            with open(os.path.join(dirs["out"], s["id"] + ".csv"), "r", encoding="utf-8-sig", newline="") as fin:
+                rdr = csv.reader(fin)
+                next(rdr, None)
+                for row in rdr:
+                    w.writerow(row)
+                    n += 1
+    _write_atomic(output, write)
+    return n
+
+
+def _local_worker(qdir: str, reclaim_after: float, i: int, args: Optional[argparse.Namespace] = None) -> int:
+    # --profile / --trace-alloc はワーカーごとに別ファイルへ
+    with profiled(worker_args(args or argparse.Namespace(), i), f"seimei_queue-{i}"):
+        return work(qdir, reclaim_after, f"{worker_id()}-{i}")
+
+def run(args: argparse.Namespace) -> None:
+    if args.cmd == "split":
+        m = split(args.names_csv, args.queue_dir, args.shard_size)
+        print(f"分割: {m['rows']}件 → {len(m['shards'])}シャード ({args.queue_dir})")
+    elif args.cmd == "work":
+        n = work(args.queue_dir, args.reclaim_after)
+        print(f"処理: {n}件")
+    elif args.cmd == "reclaim":
+        back = reclaim(args.queue_dir, args.older_than)
+        print(f"再投入: {len(back)}シャード {' '.join(back)}")
+    elif args.cmd == "status":
+        print(json.dumps(status(args.queue_dir), ensure_ascii=False))
+    elif args.cmd == "merge":
+        n = merge(args.queue_dir, args.output)
+        print(f"書き出し: {args.output} / {n}件")
+    else:
+        from multiprocessing import Pool
+        m = split(args.names_csv, args.queue_dir, args.shard_size)
+        print(f"分割: {m['rows']}件 → {len(m['shards'])}シャード")
+        with Pool(args.workers) as pool:
+            pool.starmap(_local_worker, [(args.queue_dir, RECLAIM_AFTER, i, args) for i in range(args.workers)])
+        n = merge(args.queue_dir, args.output)
+        print(f"書き出し: {args.output} / {n}件")
+
+def main():
+    ap = argparse.ArgumentParser(description="共有ディレクトリを使ったシャード分割の一括計算")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("split", help="名前リストをシャードに分割")
+    p.add_argument("names_csv")
+    p.add_argument("queue_dir")
+    p.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    p = sub.add_parser("work", help="シャードを取って処理（複数マシン・複数プロセスで同時に実行可）")
+    p.add_argument("queue_dir")
+    p.add_argument("--reclaim-after", type=float, default=RECLAIM_AFTER, help="止まった作業を取り戻すまでの秒数")
+    p = sub.add_parser("reclaim", help="止まった作業中シャードを todo に戻す")
+    p.add_argument("queue_dir")
+    p.add_argument("--older-than", type=float, default=RECLAIM_AFTER)
+    p = sub.add_parser("status", help="進捗を表示")
+    p.add_argument("queue_dir")
+    p = sub.add_parser("merge", help="結果を1つのCSVにまとめる")
+    p.add_argument("queue_dir")
+    p.add_argument("--output", default="results.csv")
+    p = sub.add_parser("local", help="split → ローカルの複数プロセスで work → merge")
+    p.add_argument("names_csv")
+    p.add_argument("queue_dir")
+    p.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    p.add_argument("--output", default="results.csv")
+    add_profile_args(sub.choices["work"])
+    add_profile_args(sub.choices["local"])
+    args = ap.parse_args()
+    with profiled(args, "seimei_queue"):
+        run(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+import argparse
+import json
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from seimei_calc import (
+    GRID_FIELDS,
+    GRID_KEYS,
+    calc_compact,
+    dictionary_snapshot,
+    dictionary_version,
+    load_dict,
+    normalize_name,
+    variant_version,
+)
+from seimei_profiling import add_profile_args, profiled
+
+# ====== 設定 ======
+BATCH_SIZE = 5000   # executemany 1回あたりの件数
+
+# GRID_KEYS → SQLite の列名（同じ順）
+COLUMNS = GRID_FIELDS
+GRID_COLUMNS = dict(zip(GRID_KEYS, COLUMNS))
+
+# 問い合わせで使える別名 → 列名
+ALIASES = {
+    "天格": "top", "トップ": "top",
+    "人格": "heart", "ハート": "heart",
+    "地格": "foot", "フット": "foot",
+    "外格": "side", "サイド": "side",
+    "表面": "side_surface", "サイド表面": "side_surface",
+    "本質": "side_essence", "サイド本質": "side_essence",
+    "総格": "allv", "オール": "allv",
+}
+ALIASES.update(GRID_COLUMNS)
+ALIASES.update({c: c for c in COLUMNS})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    family TEXT NOT NULL,
+    given TEXT NOT NULL,
+    top INTEGER NOT NULL,
+    heart INTEGER NOT NULL,
+    foot INTEGER NOT NULL,
+    side INTEGER NOT NULL,
+    side_surface INTEGER NOT NULL,
+    side_essence INTEGER NOT NULL,
+    allv INTEGER NOT NULL,
+    dict_version TEXT NOT NULL,
+    UNIQUE (family, given)
+);
+-- 文字 → その文字を含む保存行（辞書差分の再計算対象を引く転置インデックス）
+CREATE TABLE IF NOT EXISTS result_chars (
+    char TEXT NOT NULL,
+    result_id INTEGER NOT NULL,
+    PRIMARY KEY (char, result_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+""" + "".join(
+    f"CREATE INDEX IF NOT EXISTS idx_results_{c} ON results({c});\n" for c in COLUMNS
+)
+
+
+# ====== 接続 ======
+def open_store(path: str) -> sqlite3.Connection:
+    """結果ストアを開く（なければ作成）"""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+# ====== 書き込み ======
+def _row(family: str, given: str, res: dict, version: str) -> tuple:
+    return (family, given) + tuple(res[k] for k in GRID_KEYS) + (version,)
+
+def add_results(
+    conn: sqlite3.Connection,
+    results: Iterable[Tuple[str, str, dict]],
+    version: str,
+) -> int:
+    """
+    (姓, 名, calc結果) の列をまとめて書き込む。姓名は正規化済みの形で保存し、
+    同じ姓名がすでにあれば上書きする。書き込んだ件数を返す。
+    """
+    sql = (
+        "INSERT INTO results (family, given, " + ", ".join(COLUMNS) + ", dict_version) "
+        "VALUES (?, ?, " + ", ".join("?" for _ in COLUMNS) + ", ?) "
+        "ON CONFLICT (family, given) DO UPDATE SET "
+        + ", ".join(f"{c}=excluded.{c}" for c in COLUMNS + ("dict_version",))
+    )
+    sql_chars = (
+        "INSERT OR IGNORE INTO result_chars (char, result_id) "
+        "SELECT ?, id FROM results WHERE family = ? AND given = ?"
+    )
+
+    def flush(buf: List[tuple]) -> None:
+        conn.executemany(sql, buf)
+        conn.executemany(sql_chars, [
+            (ch, r[0], r[1]) for r in buf for ch in set(r[0] + r[1])
+        ])
+
+    n = 0
+    buf: List[tuple] = []
+    with conn:
+        for family, given, res in results:
+            buf.append(_row(normalize_name(family), normalize_name(given), res, version))
+            if len(buf) >= BATCH_SIZE:
+                flush(buf)
+                n += len(buf)
+                buf.clear()
+        if buf:
+            flush(buf)
+            n += len(buf)
+    return n
+
+def score_into(
+    conn: sqlite3.Connection,
+    names: Iterable[Tuple[str, str]],
+    table: Dict[str, int],
+) -> int:
+    """
+    名前の列を calc して書き込む。保存済みの行が別の辞書で計算されていれば、
+    先に rescore_changed で差分だけ再計算して辞書を揃える。
+    """
+    fresh = _meta(conn, "snapshot") is None
+    if not fresh:
+        rescore_changed(conn, table)
+    version = dictionary_version(table)
+    n = add_results(conn, ((f, g, calc_compact(f, g, table)) for f, g in names), version)
+    if fresh:
+        save_snapshot(conn, table)
+    return n
+
+
+# ====== 辞書スナップショットと差分再計算 ======
+def _meta(conn: sqlite3.Connection, key: str) -> Optional[str]:
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+def load_snapshot(conn: sqlite3.Connection) -> Optional[Dict[str, int]]:
+    """最後に保存した辞書スナップショット（文字→画数）"""
+    snap = _meta(conn, "snapshot")
+    return json.loads(snap) if snap is not None else None
+
+def save_snapshot(conn: sqlite3.Connection, table: Dict[str, int]) -> None:
+    """辞書スナップショットと、その辞書の版・姓名の正規化に使った異体字の表の版を保存する"""
+    snap = json.dumps(dictionary_snapshot(table), ensure_ascii=False, sort_keys=True)
+    with conn:
+        conn.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            [("snapshot", snap), ("version", dictionary_version(table)), ("variants", variant_version())],
+        )
+
+def _renormalize(conn: sqlite3.Connection) -> List[Tuple[str, str]]:
+    """
+    異体字の表・向きが変わったとき用。全行の (姓, 名) を返し、今の normalize_name で形が変わる行は
+    消しておく（add_results が新しい形で書き直す）。
+    """
+    rows = conn.execute("SELECT id, family, given FROM results").fetchall()
+    moved = [(i,) for i, f, g in rows if (normalize_name(f), normalize_name(g)) != (f, g)]
+    with conn:
+        conn.executemany("DELETE FROM result_chars WHERE result_id = ?", moved)
+        conn.executemany("DELETE FROM results WHERE id = ?", moved)
+    return [(f, g) for _, f, g in rows]
+
+def diff_snapshots(old: Dict[str, int], new: Dict[str, int]) -> Set[str]:
+    """画数が変わった文字（追加・削除は 0 との差として扱う）"""
+    return {ch for ch in old.keys() | new.keys() if old.get(ch, 0) != new.get(ch, 0)}
+
+def rescore_changed(conn: sqlite3.Connection, table: Dict[str, int]) -> Tuple[Set[str], int]:
+    """
+    保存済みスナップショットと現在の辞書を比べ、画数の変わった文字を含む行だけを
+    再計算する。スナップショットがないか、異体字の表・向きが変わっていれば全行を再計算する。
+    辞書の版が保存時と同じで、古い版の行も残っていなければ何もしない。
+    戻り値: (変わった文字, 再計算した行数)
+    """
+    version = dictionary_version(table)
+    if _meta(conn, "version") == version and conn.execute(
+        "SELECT 1 FROM results WHERE dict_version != ? LIMIT 1", (version,)
+    ).fetchone() is None:
+        return set(), 0
+
+    old = load_snapshot(conn)
+    new = dictionary_snapshot(table)
+    if old is None or _meta(conn, "variants") != variant_version():
+        changed = set(new)
+        rows = _renormalize(conn)
+    else:
+        changed = diff_snapshots(old, new)
+        rows = []
+        chars = sorted(changed)
+        # SQLite の変数上限に収まるよう分割して引く
+        for i in range(0, len(chars), 500):
+            part = chars[i:i + 500]
+            rows += conn.execute(
+                "SELECT family, given FROM results WHERE id IN ("
+                "SELECT result_id FROM result_chars WHERE char IN ("
+                + ", ".join("?" for _ in part) + "))",
+                part,
+            ).fetchall()
+        rows = list(dict.fromkeys(rows))
+
+    n = add_results(conn, ((f, g, calc_compact(f, g, table)) for f, g in rows), version)
+    with conn:
+        # 影響のない行も新しい辞書で計算したのと同じ値なので版だけ付け替える
+        conn.execute("UPDATE results SET dict_version = ? WHERE dict_version != ?", (version, version))
+    save_snapshot(conn, table)
+    return changed, n
+
+
+# ====== 問い合わせ ======
+def parse_conditions(exprs: Iterable[str]) -> Dict[str, int]:
+    """['総格=24', '人格=16'] → {'allv': 24, 'heart': 16}"""
+    conds: Dict[str, int] = {}
+    for e in exprs:
+        k, sep, v = e.partition("=")
+        col = ALIASES.get(k.strip())
+        if not sep or col is None:
+            raise ValueError(f"条件の形式が不正です: {e}（例: 総格=24）")
+        conds[col] = int(v)
+    return conds
+
+def query(conn: sqlite3.Connection, **conds: int) -> List[dict]:
+    """列=値 の AND 条件で保存済み結果を引く（各列のインデックスを使う）"""
+    bad = [c for c in conds if c not in COLUMNS]
+    if bad:
+        raise ValueError(f"未知の列: {bad}")
+    sql = "SELECT family, given, " + ", ".join(COLUMNS) + ", dict_version FROM results"
+    if conds:
+        sql += " WHERE " + " AND ".join(f"{c} = ?" for c in conds)
+    sql += " ORDER BY id"
+    out = []
+    for row in conn.execute(sql, tuple(conds.values())):
+        d = {"姓": row[0], "名": row[1]}
+        d.update(zip(GRID_KEYS, row[2:2 + len(COLUMNS)]))
+        d["dict_version"] = row[-1]
+        out.append(d)
+    return out
+
+
+def run(args: argparse.Namespace) -> None:
+    conn = open_store(args.db)
+    try:
+        if args.cmd == "add":
+            from seimei_batch import read_names
+            table = load_dict()
+            n = score_into(conn, read_names(args.names_csv), table)
+            print(f"保存: {args.db} / {n}件 (辞書 {dictionary_version(table)})")
+        elif args.cmd == "rescore":
+            table = load_dict()
+            changed, n = rescore_changed(conn, table)
+            print(f"変更文字: {''.join(sorted(changed)) if len(changed) <= 50 else len(changed)}")
+            print(f"再計算: {n}件 (辞書 {dictionary_version(table)})")
+        else:
+            rows = query(conn, **parse_conditions(args.conditions))
+            for r in rows:
+                grids = " ".join(f"{c}={r[k]}" for k, c in GRID_COLUMNS.items())
+                print(f"{r['姓']} {r['名']}  {grids}  [{r['dict_version']}]")
+            print(f"{len(rows)}件")
+    finally:
+        conn.close()
+
+def main():
+    ap = argparse.ArgumentParser(description="計算結果の SQLite ストア")
+    ap.add_argument("db", help="SQLite ファイル")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_add = sub.add_parser("add", help="名前リストを計算して保存")
+    p_add.add_argument("names_csv", help="family, given 列を持つCSV")
+    p_q = sub.add_parser("query", help="格の値で検索（例: 総格=24 人格=16）")
+    p_q.add_argument("conditions", nargs="*")
+    sub.add_parser("rescore", help="辞書の変更で画数が変わった文字を含む行だけ再計算")
+    add_profile_args(p_add)
+    add_profile_args(sub.choices["rescore"])
+    args = ap.parse_args()
+    with profiled(args, "seimei_store"):
+        run(args)
+
+if __name__ == "__main__":
+    main()
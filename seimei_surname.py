@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import argparse
+import csv
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from seimei_calc import GRID_KEYS, grids_from_strokes, load_dict, normalize_name, stroke_for_char
+from seimei_fortune import score
+
+# ====== 設定 ======
+SURNAMES_FILE = "surnames_common.csv"   # 頻出姓リスト（rank, surname）
+
+
+# ====== ローダ ======
+def load_surnames(limit: Optional[int] = None) -> List[str]:
+    """surnames_common.csv を頻度順で読み込む"""
+    path = os.path.join(os.path.dirname(__file__), SURNAMES_FILE)
+    out: List[str] = []
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        rdr = csv.DictReader(f)
+        for row in rdr:
+            s = (row.get("surname") or "").strip()
+            if s:
+                out.append(s)
+            if limit is not None and len(out) >= limit:
+                break
+    return out
+
+
+# ====== 姓替えシミュレーション ======
+def simulate(
+    given: str,
+    surnames: Iterable[str],
+    table: Dict[str, int],
+) -> List[Tuple[int, str, dict]]:
+    """
+    1つの名を複数の姓と組み合わせて 5格を算出し、吉凶の点数が高い順に返す。
+    名の正規化と画数は最初に1回だけ求め、姓ごとには姓の画数だけを引く。
+    戻り値: [(点数, 姓, 結果), ...]（結果は calc と同じキーで、内訳は含まない）
+    """
+    gs = [stroke_for_char(c, table) for c in normalize_name(given)]
+
+    out: List[Tuple[int, str, dict]] = []
+    seen = set()
+    for family in surnames:
+        f = normalize_name(family)
+        if not f or f in seen:
+            continue
+        seen.add(f)
+        fs = [stroke_for_char(c, table) for c in f]
+        res = dict(zip(GRID_KEYS, grids_from_strokes(fs, gs)))
+        out.append((score(res), family, res))
+
+    # 同点は入力（頻度）順を保つ
+    out.sort(key=lambda e: e[0], reverse=True)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="1つの名を複数の姓で5格計算し、吉凶順に並べる")
+    ap.add_argument("given", help="名（例: 花子）")
+    ap.add_argument("--surnames", nargs="*", help="候補の姓（省略時は頻出姓リスト）")
+    ap.add_argument("--limit", type=int, default=None, help="頻出姓リストの上位何件を使うか")
+    ap.add_argument("--output", default=None, help="CSVに書き出す場合のファイル名")
+    args = ap.parse_args()
+
+    table = load_dict()
+    surnames = args.surnames or load_surnames(args.limit)
+    ranked = simulate(args.given, surnames, table)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8-sig", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=["姓", "名", "点数"] + list(GRID_KEYS))
+            w.writeheader()
+            for s, family, res in ranked:
+                w.writerow({"姓": family, "名": args.given, "点数": s, **res})
+        print(f"書き出し: {args.output} / {len(ranked)}件")
+        return
+
+    for rank, (s, family, res) in enumerate(ranked, start=1):
+        grids = " ".join(f"{k[:3]}={res[k]}" for k in GRID_KEYS if k not in ("サイド（表面）", "サイド（本質）"))
+        print(f"{rank:>3}. {family} {args.given}  点数={s}  {grids}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import math
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List
+
+
+class StageTimer:
+    """
+    処理を段ごとに計測する（ミリ秒）。
+    lap(name) は前回の lap（または開始）からの経過を name に記録する。
+    skip() は前回の lap からの経過を捨てる（計測に含めない処理の後に呼ぶ）。
+    """
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, float] = {}
+        self._t0 = self._last = time.perf_counter()
+
+    def lap(self, name: str) -> float:
+        now = time.perf_counter()
+        ms = (now - self._last) * 1000
+        self.stages[name] = self.stages.get(name, 0.0) + ms
+        self._last = now
+        return ms
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - t0) * 1000
+            self.stages[name] = self.stages.get(name, 0.0) + ms
+            self._last = time.perf_counter()
+
+    def skip(self) -> float:
+        """前回の lap からの経過をどの段にも入れず、合計からも除く（計測しない処理の後に呼ぶ）"""
+        now = time.perf_counter()
+        ms = (now - self._last) * 1000
+        self._t0 += now - self._last
+        self._last = now
+        return ms
+
+    def total(self) -> float:
+        return (self._last - self._t0) * 1000
+
+
+# ====== 集計 ======
+def percentile(sorted_values: List[float], p: float) -> float:
+    """昇順に並んだ値の p パーセンタイル（最近順位法）"""
+    if not sorted_values:
+        return 0.0
+    k = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[k - 1]
+
+def summarize(values: Iterable[float]) -> Dict[str, float]:
+    """件数・平均・p50/p95/p99・最大"""
+    v = sorted(values)
+    if not v:
+        return {"n": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "n": len(v),
+        "mean": sum(v) / len(v),
+        "p50": percentile(v, 50),
+        "p95": percentile(v, 95),
+        "p99": percentile(v, 99),
+        "max": v[-1],
+    }
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+import argparse
+import csv
+import os
+import unicodedata
+from typing import Dict, Iterable, List, Set, Tuple
+
+from seimei_calc import VARIANT_DIRECTION, VARIANT_DIRECTIONS, VARIANTS_FILE, load_dict, load_variants, variant_table
+
+# 異体字の表 kanji_variants.csv（variant, target, source 列）を作る。
+# Unihan の Unihan_Variants.txt（https://www.unicode.org/Public/UCD/latest/ucd/Unihan.zip）から
+# 「辞書にない字 → 辞書にある異体字」の組を取り出し、手で足した行（source=manual）と合わせて書き出す。
+# seimei_calc は起動時にこの表を読み、1つの str.translate 用の表にして normalize_name で使う。
+# 既定の向き（to_old）で新字体から旧字体へ写すのは、kanji_old_strokes.csv（char, strokes）に画数がある字だけ。
+# 旧字体の行を足したら、その字の画数も kanji_old_strokes.csv に足す（Unihan からの行は異体字として新字体に寄せるだけ）。
+#
+# 使い方例:
+# python seimei_variants.py compile Unihan_Variants.txt     # kanji_variants.csv を作り直す（manual の行は残す）
+# python seimei_variants.py show 桜井 国男                   # 既定の to_old（旧字体で数える）
+# python seimei_variants.py show 櫻井 國男 --direction to_new
+# python seimei_variants.py stat
+
+UNIHAN_FIELDS = ("kZVariant", "kSemanticVariant", "kSpecializedSemanticVariant")
+MANUAL = "manual"
+
+Pair = Tuple[str, str, str]   # (異体字, 写像先, 出どころ)
+
+
+def _cp(token: str) -> str:
+    """「U+6AFB<kMatthews」のような表記から1文字を取り出す"""
+    return chr(int(token.split("<")[0][2:], 16))
+
+def parse_unihan(path: str, fields: Iterable[str] = UNIHAN_FIELDS) -> List[Pair]:
+    """Unihan_Variants.txt の指定した欄を (字, 異体字, 欄名) の列にする"""
+    fields = set(fields)
+    out: List[Pair] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            cp, field, values = line.rstrip("\n").split("\t", 2)
+            if field not in fields:
+                continue
+            ch = _cp(cp)
+            for v in values.split():
+                out.append((ch, _cp(v), field))
+    return out
+
+def compile_variants(pairs: Iterable[Pair], known: Set[str]) -> Tuple[List[Pair], Dict[str, List[str]]]:
+    """
+    (字, 異体字, 出どころ) の組から、辞書（known）にない字 → 辞書にある字 の写像を作る。
+    Unihan の異体字は双方向に書かれていないことがあるので、両向きを候補にする。
+    辞書にある字の候補が2つ以上ある字は写像せず、ambiguous として返す。
+    """
+    cands: Dict[str, Dict[str, str]] = {}
+    for a, b, src in pairs:
+        a = unicodedata.normalize("NFKC", a)
+        b = unicodedata.normalize("NFKC", b)
+        for x, y in ((a, b), (b, a)):
+            if x != y and x not in known and y in known:
+                cands.setdefault(x, {}).setdefault(y, src)
+    out: List[Pair] = []
+    ambiguous: Dict[str, List[str]] = {}
+    for x in sorted(cands):
+        ys = cands[x]
+        if len(ys) == 1:
+            (y, src), = ys.items()
+            out.append((x, y, src))
+        else:
+            ambiguous[x] = sorted(ys)
+    return out, ambiguous
+
+
+# ====== kanji_variants.csv ======
+def default_path() -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), VARIANTS_FILE)
+
+def read_variants(path: str) -> List[Pair]:
+    try:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            return [
+                ((row.get("variant") or "").strip(), (row.get("target") or "").strip(), (row.get("source") or "").strip())
+                for row in csv.DictReader(f)
+                if (row.get("variant") or "").strip() and (row.get("target") or "").strip()
+            ]
+    except FileNotFoundError:
+        return []
+
+def write_variants(path: str, pairs: Iterable[Pair]) -> int:
+    rows = sorted(pairs)
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["variant", "target", "source"])
+        w.writerows(rows)
+    return len(rows)
+
+def merge_manual(compiled: List[Pair], existing: List[Pair]) -> List[Pair]:
+    """手で足した行（source=manual）は Unihan の結果より優先して残す"""
+    manual = {v: (v, t, s) for v, t, s in existing if s == MANUAL}
+    return list(manual.values()) + [p for p in compiled if p[0] not in manual]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="異体字の表 kanji_variants.csv を作る・確かめる")
+    ap.add_argument("--path", default=None, help=f"既定: {VARIANTS_FILE}")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("compile", help="Unihan_Variants.txt から作り直す")
+    p.add_argument("unihan", help="Unihan_Variants.txt")
+    p.add_argument("--master", default=None, help="辞書にある字の判定に使うマスタCSV（既定: kanji_master_joyo.csv）")
+    p.add_argument("--fields", nargs="*", default=list(UNIHAN_FIELDS), help="使う欄")
+    p = sub.add_parser("show", help="名前を正規化して表示")
+    p.add_argument("names", nargs="+")
+    p.add_argument("--direction", default=VARIANT_DIRECTION, choices=VARIANT_DIRECTIONS)
+    sub.add_parser("stat", help="表の件数")
+    args = ap.parse_args()
+
+    path = args.path or default_path()
+    if args.cmd == "compile":
+        known = set(load_dict(args.master))
+        compiled, ambiguous = compile_variants(parse_unihan(args.unihan, args.fields), known)
+        n = write_variants(path, merge_manual(compiled, read_variants(path)))
+        print(f"書き出し: {path} / {n}件（写像先が決まらない字 {len(ambiguous)}件）")
+        for ch, ys in list(ambiguous.items())[:20]:
+            print(f"  {ch} → {'/'.join(ys)}")
+    elif args.cmd == "show":
+        import seimei_calc
+        seimei_calc.set_variant_direction(args.direction)
+        for name in args.names:
+            print(f"{name} → {seimei_calc.normalize_name(name)}")
+    else:
+        rows = read_variants(path)
+        by_source: Dict[str, int] = {}
+        for _, _, s in rows:
+            by_source[s or "-"] = by_source.get(s or "-", 0) + 1
+        variants = load_variants(path)
+        print(f"{path}: {len(rows)}行 ({', '.join(f'{s}={n}' for s, n in sorted(by_source.items()))})")
+        for d in VARIANT_DIRECTIONS:
+            print(f"  {d}: {len(variant_table(variants, d))}字")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import argparse
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from seimei_calc import GRID_KEYS, GridPlan, load_dict, normalize_name, plan_for, stroke_for_char
+
+# 5格の一括計算（numpy）。
+# 姓・名をそれぞれ重複なしにして画数列を1回ずつ引き、
+# 行を姓・名の文字数 (fn, gn) ごとにまとめ、画数を (行数, fn+gn) の行列にして、
+# seimei_calc の評価計画（GridPlan）の位置を 0/1 の重み行列にしたものを掛ける。
+# スカラー版（grids_from_strokes）と同じ計画を使うので、ルールは GRID_RULES の1か所だけ。
+#
+# 使い方例:
+# python seimei_vector.py names.csv --output grids.csv
+
+SIDE = GRID_KEYS.index("サイド")
+ALLV = GRID_KEYS.index("オール（総格）")
+
+
+def plan_weights(plan: GridPlan) -> Tuple[np.ndarray, np.ndarray]:
+    """計画を (fn+gn, 7) の重み行列と長さ 7 の定数ベクトルにする"""
+    w = np.zeros((plan.fn + plan.gn, len(GRID_KEYS)), dtype=np.int32)
+    for j, pos in enumerate(plan.positions):
+        w[list(pos), j] = 1
+    return w, np.asarray(plan.consts, dtype=np.int32)
+
+def evaluate_plan(plan: GridPlan, strokes: np.ndarray) -> np.ndarray:
+    """同じ文字数の行の画数行列 (n, fn+gn) から 5格 (n, 7) を求める"""
+    w, c = plan_weights(plan)
+    out = strokes @ w + c
+    out[:, SIDE] = np.maximum(out[:, SIDE], 0)
+    allv = out[:, ALLV]
+    out[:, ALLV] = np.where(allv > 60, (allv - 1) % 60 + 1, allv)
+    return out
+
+def _padded(strokes: List[List[int]]) -> np.ndarray:
+    """長さの違う画数列を右を 0 で埋めた行列にする"""
+    width = max((len(s) for s in strokes), default=0)
+    m = np.zeros((len(strokes), width), dtype=np.int32)
+    for i, s in enumerate(strokes):
+        m[i, :len(s)] = s
+    return m
+
+def grids_by_ids(
+    fstrokes: List[List[int]],
+    gstrokes: List[List[int]],
+    fam_ids: np.ndarray,
+    giv_ids: np.ndarray,
+) -> np.ndarray:
+    """
+    重複なしの姓・名の画数列と、行ごとの 姓・名の番号から (行数, 7) を求める。
+    行を (fn, gn) ごとにまとめ、画数行列は番号で引いて作る（行ごとの Python の処理なし）。
+    """
+    fpad, gpad = _padded(fstrokes), _padded(gstrokes)
+    flen = np.array([len(s) for s in fstrokes], dtype=np.int32)[fam_ids]
+    glen = np.array([len(s) for s in gstrokes], dtype=np.int32)[giv_ids]
+
+    out = np.zeros((len(fam_ids), len(GRID_KEYS)), dtype=np.int32)
+    # (fn, gn) を1つの整数にして並べ替え、同じ組の行を連続させる
+    key = flen * (gpad.shape[1] + 1) + glen
+    order = np.argsort(key, kind="stable")
+    bounds = np.cumsum(np.bincount(key)) if len(key) else []
+    start = 0
+    for k, end in enumerate(bounds):
+        if end == start:
+            continue
+        rows = order[start:end]
+        fn, gn = divmod(k, gpad.shape[1] + 1)
+        m = np.hstack([fpad[fam_ids[rows], :fn], gpad[giv_ids[rows], :gn]])
+        out[rows] = evaluate_plan(plan_for(fn, gn), m)
+        start = end
+    return out
+
+def grids_by_length(fstrokes: List[List[int]], gstrokes: List[List[int]]) -> np.ndarray:
+    """姓・名の画数列の組（行ごと）から入力順の (n, 7) を返す"""
+    ids = np.arange(len(fstrokes))
+    return grids_by_ids(fstrokes, gstrokes, ids, ids)
+
+def score_grids(names: Iterable[Tuple[str, str]], table: Dict[str, int]) -> np.ndarray:
+    """(姓, 名) の列の 5格を (n, 7) の int32 配列で返す（列は GRID_KEYS 順）"""
+    names = list(names)
+    fcol = [f for f, _ in names]
+    gcol = [g for _, g in names]
+    fams = {f: i for i, f in enumerate(dict.fromkeys(fcol))}
+    givs = {g: i for i, g in enumerate(dict.fromkeys(gcol))}
+
+    def strokes(name: str) -> List[int]:
+        return [stroke_for_char(c, table) for c in normalize_name(name)]
+
+    return grids_by_ids(
+        [strokes(f) for f in fams], [strokes(g) for g in givs],
+        np.array([fams[f] for f in fcol], dtype=np.intp),
+        np.array([givs[g] for g in gcol], dtype=np.intp),
+    )
+
+
+def main():
+    import csv
+    from seimei_batch import read_names
+
+    ap = argparse.ArgumentParser(description="名前リストの5格を numpy でまとめて計算し、CSVに書き出す")
+    ap.add_argument("names_csv", help="family, given 列を持つCSV")
+    ap.add_argument("--output", default="grids.csv")
+    args = ap.parse_args()
+
+    table = load_dict()
+    names = list(read_names(args.names_csv))
+    grids = score_grids(names, table)
+    with open(args.output, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["姓", "名"] + list(GRID_KEYS))
+        for (family, given), row in zip(names, grids.tolist()):
+            w.writerow([family, given] + row)
+    print(f"書き出し: {args.output} / {len(names)}件")
+
+if __name__ == "__main__":
+    main()
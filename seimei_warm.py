@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+import argparse
+import csv
+import hashlib
+import itertools
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional, Sequence
+
+from seimei_calc import GridResult, calc_compact, dictionary_version, normalize_name
+from seimei_surname import load_surnames
+
+# よく使われる 姓 × 名 の計算済み結果を1つのファイルに持ち、起動直後から引けるようにする。
+# ファイルは mmap で開くオープンアドレス法のハッシュ表で、キーは正規化済みの「姓\t名」。
+# ヘッダに辞書の版（dictionary_version）を書いておき、辞書が変わっていれば ensure_warm が作り直す。
+#
+# ファイルの形（数値はリトルエンディアン）:
+#   ヘッダ   HEADER: マジック, 形式の版, 辞書の版(12字), スロット数(2の冪), キー数
+#   スロット SLOT × スロット数: キーのハッシュ(0=空), キーの位置, キーの長さ, 姓の字数, 名の字数, 5格×7
+#   キー領域: 「姓\t名」の UTF-8 と、続けて1文字ごとの画数（1バイトずつ）
+#
+# 使い方例:
+# python seimei_warm.py build                 # build/warm_results.bin を作る
+# python seimei_warm.py get 田中 太郎
+# python seimei_warm.py stat
+
+GIVEN_NAMES_FILE = "given_names_common.csv"   # 名の頻度順リスト（同梱）
+WARM_FILE = os.path.join("build", "warm_results.bin")
+
+MAGIC = b"SWRM"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sH12sII")
+SLOT = struct.Struct("<QIHBB7h")
+LOAD_FACTOR = 0.5
+
+
+def load_given_names(limit: Optional[int] = None) -> List[str]:
+    """given_names_common.csv を頻度順で読み込む"""
+    path = os.path.join(os.path.dirname(__file__), GIVEN_NAMES_FILE)
+    out: List[str] = []
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            g = (row.get("given") or "").strip()
+            if g:
+                out.append(g)
+            if limit is not None and len(out) >= limit:
+                break
+    return out
+
+def default_path() -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), WARM_FILE)
+
+def _key(f: str, g: str) -> bytes:
+    return f"{f}\t{g}".encode("utf-8")
+
+def _hash(key: bytes) -> int:
+    # プロセスをまたいで同じ値になるハッシュ（0 は空きスロットの印なので使わない）
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") or 1
+
+
+# ====== 作成 ======
+def build_warm(
+    path: str,
+    table: Dict[str, int],
+    surnames: Sequence[str],
+    givens: Sequence[str],
+) -> int:
+    """姓 × 名 を計算してファイルに書き、キー数を返す（一時ファイルに書いてから置き換える）"""
+    from seimei_batch import score_batch
+
+    results, _ = score_batch(itertools.product(surnames, givens), table, compact=True)
+    entries: Dict[bytes, GridResult] = {}
+    for r in results:
+        # 画数は1バイトで持つので、範囲外の字を含む名前は入れない（calc にまかせる）
+        if all(0 <= v <= 255 for v in r.fs + r.gs):
+            entries.setdefault(_key(r.family, r.given), r)
+
+    nslots = 1
+    while nslots * LOAD_FACTOR < max(len(entries), 1):
+        nslots *= 2
+    slots = [None] * nslots
+    blob = bytearray()
+    base = HEADER.size + nslots * SLOT.size
+    for key, r in entries.items():
+        h = _hash(key)
+        off = base + len(blob)
+        blob += key
+        blob += bytes(r.fs + r.gs)
+        i = h & (nslots - 1)
+        while slots[i] is not None:
+            i = (i + 1) & (nslots - 1)
+        slots[i] = SLOT.pack(h, off, len(key), len(r.fs), len(r.gs), *r.grids)
+
+    empty = SLOT.pack(0, 0, 0, 0, 0, *([0] * 7))
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, dictionary_version(table).encode("ascii"), nslots, len(entries)))
+        for s in slots:
+            f.write(s if s is not None else empty)
+        f.write(blob)
+    os.replace(tmp, path)
+    return len(entries)
+
+
+# ====== 参照 ======
+class WarmTable:
+    """build_warm で作ったファイルを mmap で開いて引く"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, version, self.nslots, self.nkeys = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"warm ファイルの形式が違います: {path}")
+        self.dict_version = version.decode("ascii")
+        self._mask = self.nslots - 1
+
+    def get(self, family: str, given: str) -> Optional[GridResult]:
+        """計算済みなら GridResult、なければ None"""
+        f = normalize_name(family)
+        g = normalize_name(given)
+        key = _key(f, g)
+        h = _hash(key)
+        mm = self._mm
+        i = h & self._mask
+        while True:
+            sh, off, klen, fn, gn, *grids = SLOT.unpack_from(mm, HEADER.size + i * SLOT.size)
+            if sh == 0:
+                return None
+            if sh == h and mm[off:off + klen] == key:
+                strokes = mm[off + klen:off + klen + fn + gn]
+                return GridResult(f, g, tuple(strokes[:fn]), tuple(strokes[fn:]), *grids)
+            i = (i + 1) & self._mask
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __enter__(self) -> "WarmTable":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_version(path: str) -> Optional[str]:
+    """ファイルの辞書の版（なければ・形式が違えば None）"""
+    try:
+        with open(path, "rb") as f:
+            magic, fmt, version, _, _ = HEADER.unpack(f.read(HEADER.size))
+    except (OSError, struct.error):
+        return None
+    if magic != MAGIC or fmt != FORMAT_VERSION:
+        return None
+    return version.decode("ascii")
+
+def ensure_warm(
+    table: Dict[str, int],
+    path: Optional[str] = None,
+    surnames: Optional[Sequence[str]] = None,
+    givens: Optional[Sequence[str]] = None,
+) -> WarmTable:
+    """辞書の版が一致するファイルを開く。なければ・版が違えば作り直してから開く"""
+    path = path or default_path()
+    if read_version(path) != dictionary_version(table):
+        build_warm(
+            path, table,
+            load_surnames() if surnames is None else surnames,
+            load_given_names() if givens is None else givens,
+        )
+    return WarmTable(path)
+
+def calc_warm(family: str, given: str, table: Dict[str, int], warm: Optional[WarmTable]) -> GridResult:
+    """warm ファイルにあればそれを、なければ計算した結果を返す"""
+    if warm is not None:
+        res = warm.get(family, given)
+        if res is not None:
+            return res
+    return calc_compact(family, given, table)
+
+
+def main():
+    from seimei_calc import GRID_FIELDS, load_dict
+
+    ap = argparse.ArgumentParser(description="よく使われる姓×名の計算済み結果ファイル")
+    ap.add_argument("--path", default=None, help=f"既定: {WARM_FILE}")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("build", help="作り直す（辞書の版が同じでも）")
+    p.add_argument("--surnames", type=int, default=None, help="使う姓の数（頻度順の上位）")
+    p.add_argument("--givens", type=int, default=None, help="使う名の数（頻度順の上位）")
+    p = sub.add_parser("get", help="1件引く（版が古ければ作り直す）")
+    p.add_argument("family")
+    p.add_argument("given")
+    sub.add_parser("stat", help="ファイルの情報")
+    args = ap.parse_args()
+
+    path = args.path or default_path()
+    table = load_dict()
+    if args.cmd == "build":
+        n = build_warm(path, table, load_surnames(args.surnames), load_given_names(args.givens))
+        print(f"書き出し: {path} / {n}件 (辞書 {dictionary_version(table)})")
+    elif args.cmd == "get":
+        with ensure_warm(table, path) as warm:
+            res = warm.get(args.family, args.given)
+        if res is None:
+            print("未登録（calc で計算してください）")
+        else:
+            print(f"{res.family} {res.given}  " + " ".join(f"{c}={v}" for c, v in zip(GRID_FIELDS, res.grids)))
+    else:
+        version = read_version(path)
+        if version is None:
+            print(f"{path}: なし")
+            return
+        with WarmTable(path) as warm:
+            current = dictionary_version(table)
+            state = "最新" if version == current else f"古い（現在の辞書 {current}）"
+            print(f"{path}: {warm.nkeys}件 / スロット {warm.nslots} / 辞書 {version} {state}"
+                  f" / {os.path.getsize(path):,} byte")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import argparse
+import csv
+import json
+from typing import Dict, List, Sequence, Tuple
+
+from seimei_calc import GRID_KEYS, grids_from_strokes, load_dict, normalize_name, stroke_for_char
+from seimei_profiling import add_profile_args, profiled
+
+# ルールJSONの形式と適用順序は apply_stroke_overrides.py と同じ:
+# 1) 基本値 = マスタの画数
+# 2) relative_groups を順に足し合わせ
+# 3) absolute_overrides があれば最終値をその値に置換
+# ここでは CSV を書き出さず、ルールごとに 文字→画数 の列を作って比較する。
+
+
+# ====== ルールのコンパイル ======
+def load_rules(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def compile_rules(base: Dict[str, int], rules: dict) -> Dict[str, int]:
+    """マスタ（文字→画数）にルールを適用した新しい表を返す（マスタにない文字は対象外）"""
+    out = dict(base)
+    for grp in rules.get("relative_groups", []):
+        offset = int(grp.get("offset", 0))
+        for ch in set(grp.get("chars", "")):
+            if ch in out:
+                out[ch] += offset
+    for ch, v in rules.get("absolute_overrides", {}).items():
+        if ch in out:
+            out[ch] = int(v)
+    return out
+
+
+# ====== 複数ルールの一括評価 ======
+def evaluate(
+    names: Sequence[Tuple[str, str]],
+    tables: Sequence[Dict[str, int]],
+) -> List[List[Tuple[int, ...]]]:
+    """
+    名前リストを複数の辞書（ルールごとの表）で一括計算する。
+    1) 名前に出てくる文字を集めて番号を振り、辞書ごとに「番号→画数」の列を作る
+    2) 全辞書で画数が同じ文字だけからなる名前は1回だけ計算して使い回す
+    戻り値: names と同じ順で、各要素は辞書ごとの 5格タプルのリスト
+    """
+    char_ids: Dict[str, int] = {}
+    encoded: List[Tuple[List[int], List[int]]] = []
+    for family, given in names:
+        fi = [char_ids.setdefault(c, len(char_ids)) for c in normalize_name(family)]
+        gi = [char_ids.setdefault(c, len(char_ids)) for c in normalize_name(given)]
+        encoded.append((fi, gi))
+
+    chars = list(char_ids)
+    columns = [[stroke_for_char(c, t) for c in chars] for t in tables]
+    # 辞書によって画数が変わる文字
+    varies = [len({col[i] for col in columns}) > 1 for i in range(len(chars))]
+
+    out: List[List[Tuple[int, ...]]] = []
+    for fi, gi in encoded:
+        if any(varies[i] for i in fi) or any(varies[i] for i in gi):
+            out.append([
+                grids_from_strokes([col[i] for i in fi], [col[i] for i in gi])
+                for col in columns
+            ])
+        else:
+            col = columns[0]
+            g = grids_from_strokes([col[i] for i in fi], [col[i] for i in gi])
+            out.append([g] * len(columns))
+    return out
+
+def changed_grids(per_table: Sequence[Tuple[int, ...]]) -> List[str]:
+    """辞書間で値が変わる格の名前"""
+    return [k for j, k in enumerate(GRID_KEYS) if len({g[j] for g in per_table}) > 1]
+
+
+def run(args: argparse.Namespace) -> None:
+    from seimei_batch import read_names
+
+    base = load_dict(args.base)
+    rules = [load_rules(p) for p in args.rules_json]
+    labels = [r.get("version") or p for r, p in zip(rules, args.rules_json)]
+    # 元のマスタそのものも比較対象に含める
+    tables = [base] + [compile_rules(base, r) for r in rules]
+    labels = ["base"] + labels
+
+    names = list(read_names(args.names_csv))
+    results = evaluate(names, tables)
+
+    fields = ["姓", "名", "changed", "changed_grids"]
+    fields += [f"{lb}:{k}" for lb in labels for k in GRID_KEYS]
+    n_changed = 0
+    with open(args.output, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=fields)
+        w.writeheader()
+        for (family, given), per_table in zip(names, results):
+            diff = changed_grids(per_table)
+            if diff:
+                n_changed += 1
+            elif args.changed_only:
+                continue
+            row = {"姓": family, "名": given, "changed": int(bool(diff)), "changed_grids": "|".join(diff)}
+            for lb, g in zip(labels, per_table):
+                row.update({f"{lb}:{k}": v for k, v in zip(GRID_KEYS, g)})
+            w.writerow(row)
+
+    print(f"書き出し: {args.output} / {len(names)}件中 {n_changed}件で値が変化 ({', '.join(labels)})")
+
+def main():
+    ap = argparse.ArgumentParser(description="複数のルールJSONで名前リストを一括計算し、差分を出す")
+    ap.add_argument("names_csv", help="family, given 列を持つCSV")
+    ap.add_argument("rules_json", nargs="+", help="比較するルールJSON（複数可）")
+    ap.add_argument("--base", default=None, help="ルールを適用する元のマスタCSV（省略時は kanji_master_joyo.csv）")
+    ap.add_argument("--output", default="whatif.csv")
+    ap.add_argument("--changed-only", action="store_true", help="値が変わる名前だけ書き出す")
+    add_profile_args(ap)
+    args = ap.parse_args()
+    with profiled(args, "seimei_whatif"):
+        run(args)
+
+if __name__ == "__main__":
+    main()